@@ -100,6 +100,7 @@ def main():
             network.links[link_id].update_flow(flow)
         
         inc_time = calculate_total_travel_time(network)
+        inc_flow_arr = network.flow_arr.copy()
         inc_duration = time.time() - start_time
         
         logger.info(f"  增量分配完成:")
@@ -131,6 +132,7 @@ def main():
             network.links[link_id].update_flow(flow)
         
         fw_time = calculate_total_travel_time(network)
+        fw_flow_arr = network.flow_arr.copy()
         fw_duration = time.time() - start_time
         
         logger.info(f"  Frank-Wolfe分配完成:")
@@ -174,20 +176,10 @@ def main():
         # 绘制增量分配与Frank-Wolfe的流量差异
         logger.info("  生成增量分配与Frank-Wolfe流量差异图...")
         
-        # 使用两个独立的网络对象保存流量状态
-        network_inc_copy = Network()
-        network_inc_copy.load_from_json(network_file)
-        for link_id, flow in inc_flows.items():
-            network_inc_copy.links[link_id].update_flow(flow)
-        
-        network_fw_copy = Network()
-        network_fw_copy.load_from_json(network_file)
-        for link_id, flow in fw_flows.items():
-            network_fw_copy.links[link_id].update_flow(flow)
-        
         plot_flow_difference(
-            network_inc_copy,
-            network_fw_copy,
+            network,
+            inc_flow_arr,
+            fw_flow_arr,
             label1="增量分配",
             label2="Frank-Wolfe",
             title="增量分配 vs Frank-Wolfe 流量差异对比",
@@ -221,14 +213,14 @@ def main():
         logger.info(f"{'路段':<8} {'流量':<10} {'容量':<10} {'流量比':<10} {'行程时间':<12} {'自由流时间':<12}")
         logger.info("-" * 80)
         
-        for link_id, perf in sorted(performance.items()):
+        for i in network.sorted_link_order:
             logger.info(
-                f"{link_id:<8} "
-                f"{perf['flow']:<10.1f} "
-                f"{perf['capacity']:<10.0f} "
-                f"{perf['ratio']:<10.2f} "
-                f"{perf['travel_time']:<12.3f} "
-                f"{perf['free_flow_time']:<12.3f}"
+                f"{performance['link_ids'][i]:<8} "
+                f"{performance['flow'][i]:<10.1f} "
+                f"{performance['capacity'][i]:<10.0f} "
+                f"{performance['ratio'][i]:<10.2f} "
+                f"{performance['travel_time'][i]:<12.3f} "
+                f"{performance['free_flow_time'][i]:<12.3f}"
             )
         logger.info("-" * 80)
         
@@ -1,13 +1,16 @@
 """Traffic assignment algorithms"""
-from .dijkstra import shortest_path, get_path_links
-from .all_or_nothing import all_or_nothing_assignment
+from .dijkstra import shortest_path, shortest_path_tree, dijkstra_sssp, get_path_links
+from .all_or_nothing import all_or_nothing_assignment, all_or_nothing_flows
 from .incremental import incremental_assignment
 from .frank_wolfe import frank_wolfe_assignment
 
 __all__ = [
     'shortest_path',
+    'shortest_path_tree',
+    'dijkstra_sssp',
     'get_path_links',
     'all_or_nothing_assignment',
+    'all_or_nothing_flows',
     'incremental_assignment',
     'frank_wolfe_assignment'
 ]
@@ -1,18 +1,63 @@
 """全有全无分配算法（All-or-Nothing Assignment）"""
-from typing import Dict
+from typing import Dict, Optional, Tuple
+import logging
 import sys
 import os
 
+import numpy as np
+from numba import get_num_threads, njit, prange
+
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from models.network import Network
 from models.demand import Demand
-from .dijkstra import shortest_path, get_path_links
+from .dijkstra import _dijkstra_csr
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
+@njit(cache=True)
+def _accumulate_flows(prev_node, prev_link, dst, amount, flows):
+    """沿最短路树从终点回溯到起点，将需求量累加到途经路段"""
+    node = dst
+    while prev_link[node] != -1:
+        flows[prev_link[node]] += amount
+        node = prev_node[node]
+
+
+@njit(parallel=True, cache=True)
+def _assign_by_origin(indptr, indices, link_idx, weights, sources, od_ptr, od_dest, od_amount,
+                      n_workers):
+    """
+    并行地对各起点计算最短路树并分配需求
+    
+    起点之间相互独立，按步长交错分给各工作单元，每个单元累加到各自的
+    流量缓冲区，最后归约求和。每个单元同一时刻只持有一棵最短路树，
+    内存为O(线程数×节点数)。起点sources[k]的OD对位于 od_ptr[k]:od_ptr[k+1]，
+    n_workers为并行单元数（不超过线程数）。
+    
+    Returns:
+        (各路段流量数组, 各OD对最短路时间数组)，不可达OD对时间为inf
+    """
+    flows_per_worker = np.zeros((n_workers, weights.shape[0]))
+    od_cost = np.empty(od_dest.shape[0])
+    
+    for w in prange(n_workers):
+        worker_flows = flows_per_worker[w]
+        for k in range(w, sources.shape[0], n_workers):
+            dist, prev_node, prev_link = _dijkstra_csr(
+                indptr, indices, link_idx, weights, sources[k], -1
+            )
+            for j in range(od_ptr[k], od_ptr[k + 1]):
+                dst = od_dest[j]
+                od_cost[j] = dist[dst]
+                if dist[dst] < np.inf:
+                    _accumulate_flows(prev_node, prev_link, dst, od_amount[j], worker_flows)
+    
+    return flows_per_worker.sum(axis=0), od_cost
+
+
 def all_or_nothing_assignment(
     network: Network,
     demand: Demand
@@ -30,35 +75,130 @@ def all_or_nothing_assignment(
     Returns:
         各路段流量字典 {link_id: flow}
     """
-    logger.info("开始全有全无分配")
+    return network.array_to_flows(all_or_nothing_flows(network, demand))
+
+
+def all_or_nothing_flows(
+    network: Network,
+    demand: Demand
+) -> np.ndarray:
+    """
+    全有全无分配，返回与network.link_index对齐的流量数组
     
-    # 初始化流量字典
-    flows: Dict[str, float] = {link_id: 0.0 for link_id in network.links}
-    
-    # 统计成功和失败的OD对
-    success_count = 0
-    fail_count = 0
-    
-    # 对每个OD对进行分配
-    for origin, destination, amount in demand.get_od_pairs():
-        # 计算最短路径
-        path, cost = shortest_path(network, origin, destination)
-        
-        if path is None:
-            logger.warning(f"未找到路径: {origin} -> {destination}")
-            fail_count += 1
-            continue
-        
-        # 将需求分配到路径上的每条路段
-        path_links = get_path_links(network, path)
-        for link in path_links:
-            link_id = link.get_id()
-            flows[link_id] += amount
-        
-        success_count += 1
-        logger.debug(f"分配 {origin}->{destination}: {amount:.1f} 到路径 {' -> '.join(path)}")
-    
-    logger.info(f"全有全无分配完成: 成功 {success_count} 个OD对, 失败 {fail_count} 个")
+    Args:
+        network: 路网对象
+        demand: 需求对象
     
+    Returns:
+        各路段流量数组
+    """
+    origins, destinations, amounts = od_arrays(network, demand)
+    flows, _ = assign_od_arrays(network, origins, destinations, amounts)
     return flows
 
+
+def od_arrays(
+    network: Network,
+    demand: Demand
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    将OD需求转换为节点编号数组
+    
+    路网中不存在的节点编号记为-1
+    
+    Args:
+        network: 路网对象
+        demand: 需求对象
+    
+    Returns:
+        (起点编号数组, 终点编号数组, 需求量数组)
+    """
+    network.ensure_arrays()
+    origin_names, destination_names, amounts = demand.get_od_arrays()
+    
+    node_index = network.node_index
+    n = len(origin_names)
+    origins = np.fromiter((node_index.get(o, -1) for o in origin_names), dtype=np.int32, count=n)
+    destinations = np.fromiter((node_index.get(d, -1) for d in destination_names), dtype=np.int32, count=n)
+    
+    for i in np.flatnonzero((origins == -1) | (destinations == -1)):
+        logger.warning("OD节点不在路网中: %s -> %s", origin_names[i], destination_names[i])
+    
+    return origins, destinations, amounts.copy()
+
+
+def assign_od_arrays(
+    network: Network,
+    origins: np.ndarray,
+    destinations: np.ndarray,
+    amounts: np.ndarray,
+    weights: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, float]:
+    """
+    全有全无分配的数组接口
+    
+    共享同一起点的OD对只计算一次最短路树，各起点并行计算。
+    分配过程中同时累计最短路总出行时间 SPTT = Σ(需求量 × 最短路时间)，
+    即Frank-Wolfe相对间隙的分母Σ(y_a * t_a(x))，无需再次遍历路段
+    
+    Args:
+        network: 路网对象
+        origins: 起点编号数组（-1表示节点不存在）
+        destinations: 终点编号数组（-1表示节点不存在）
+        amounts: 需求量数组
+        weights: 路段行程时间数组，默认由当前流量计算
+    
+    Returns:
+        (各路段流量数组（与link_index对齐）, SPTT)
+    """
+    logger.info("开始全有全无分配")
+    
+    network.ensure_arrays()
+    
+    # 节点不存在的OD对直接计为失败
+    valid = (origins >= 0) & (destinations >= 0)
+    
+    # 按起点分组OD对
+    order = np.flatnonzero(valid)
+    order = order[np.argsort(origins[order], kind='stable')]
+    group_starts = np.flatnonzero(np.diff(origins[order], prepend=-1))
+    od_ptr = np.append(group_starts, len(order)).astype(np.int32)
+    
+    # 分配期间路段行程时间不变，权重只需计算一次
+    if weights is None:
+        weights = network.current_times
+    
+    # 对每个起点计算一次最短路树（并行），树只在工作单元内使用，不写入缓存
+    flows, od_cost = _assign_by_origin(
+        network.indptr, network.indices, network.link_idx, weights,
+        origins[order[group_starts]], od_ptr,
+        destinations[order], amounts[order].astype(np.float64),
+        min(get_num_threads(), max(len(group_starts), 1))
+    )
+    
+    reachable = od_cost < np.inf
+    sptt = float(np.dot(amounts[order][reachable], od_cost[reachable]))
+    
+    for j in np.flatnonzero(~reachable):
+        k = order[j]
+        logger.warning(
+            "未找到路径: %s -> %s",
+            network.node_names[origins[k]], network.node_names[destinations[k]]
+        )
+    
+    # 逐OD对的调试信息仅在DEBUG级别开启时生成
+    if logger.isEnabledFor(logging.DEBUG):
+        for j in np.flatnonzero(reachable):
+            k = order[j]
+            logger.debug(
+                "分配 %s->%s: %.1f, 路径时间 %.3f",
+                network.node_names[origins[k]], network.node_names[destinations[k]],
+                amounts[k], od_cost[j]
+            )
+    
+    success_count = int(reachable.sum())
+    fail_count = len(origins) - success_count
+    logger.info("全有全无分配完成: 成功 %d 个OD对, 失败 %d 个", success_count, fail_count)
+    
+    return flows, sptt
+
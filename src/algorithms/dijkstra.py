@@ -1,9 +1,11 @@
 """Dijkstra最短路径算法"""
-import heapq
-from typing import List, Optional, Tuple, Dict
+from typing import List, Optional, Tuple
 import sys
 import os
 
+import numpy as np
+from numba import njit
+
 # 添加src目录到路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
@@ -11,13 +13,273 @@ from models.network import Network
 from models.link import Link
 
 
+# 堆位置标记：不在堆中 / 已确定最短距离
+_NOT_IN_HEAP = -1
+_SETTLED = -2
+
+
+@njit(cache=True)
+def _sift_up(heap, pos, dist, i):
+    """将heap[i]上浮到合适位置，同时维护节点在堆中的位置"""
+    node = heap[i]
+    key = dist[node]
+    while i > 0:
+        parent = (i - 1) >> 1
+        parent_node = heap[parent]
+        if dist[parent_node] <= key:
+            break
+        heap[i] = parent_node
+        pos[parent_node] = i
+        i = parent
+    heap[i] = node
+    pos[node] = i
+
+
+@njit(cache=True)
+def _sift_down(heap, pos, dist, i, size):
+    """将heap[i]下沉到合适位置，同时维护节点在堆中的位置"""
+    node = heap[i]
+    key = dist[node]
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            break
+        if child + 1 < size and dist[heap[child + 1]] < dist[heap[child]]:
+            child += 1
+        if key <= dist[heap[child]]:
+            break
+        heap[i] = heap[child]
+        pos[heap[i]] = i
+        i = child
+    heap[i] = node
+    pos[node] = i
+
+
+@njit(cache=True)
+def _dijkstra_csr(indptr, indices, link_idx, weights, src, dst):
+    """
+    基于CSR邻接结构的Dijkstra算法
+    
+    使用支持decrease-key的索引二叉堆，每个节点至多在堆中出现一次
+    
+    Args:
+        indptr, indices, link_idx: 路网CSR结构
+        weights: 各路段权重（按路段下标）
+        src: 起点编号
+        dst: 终点编号，为-1时计算完整最短路树
+    
+    Returns:
+        (距离数组, 前驱节点数组, 前驱路段数组)，不可达节点前驱为-1
+    """
+    n = indptr.shape[0] - 1
+    dist = np.full(n, np.inf)
+    prev_node = np.full(n, -1, dtype=np.int32)
+    prev_link = np.full(n, -1, dtype=np.int32)
+    
+    # heap存放节点编号，按dist排序；pos记录节点在堆中的位置或状态标记
+    heap = np.empty(n, dtype=np.int32)
+    pos = np.full(n, _NOT_IN_HEAP, dtype=np.int32)
+    
+    dist[src] = 0.0
+    heap[0] = src
+    pos[src] = 0
+    size = 1
+    
+    while size > 0:
+        u = heap[0]
+        pos[u] = _SETTLED
+        size -= 1
+        if size > 0:
+            heap[0] = heap[size]
+            _sift_down(heap, pos, dist, 0, size)
+        
+        if u == dst:
+            break
+        
+        current_dist = dist[u]
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            if pos[v] == _SETTLED:
+                continue
+            new_dist = current_dist + weights[link_idx[e]]
+            if new_dist < dist[v]:
+                dist[v] = new_dist
+                prev_node[v] = u
+                prev_link[v] = link_idx[e]
+                if pos[v] == _NOT_IN_HEAP:
+                    heap[size] = v
+                    size += 1
+                    _sift_up(heap, pos, dist, size - 1)
+                else:
+                    # 节点已在堆中，原地减小键值
+                    _sift_up(heap, pos, dist, pos[v])
+    
+    return dist, prev_node, prev_link
+
+
+@njit(cache=True)
+def _astar_csr(indptr, indices, link_idx, weights, coords, scale, src, dst):
+    """
+    基于CSR邻接结构的A*算法（单起点单终点）
+    
+    启发函数 h(v) = scale × v到终点的直线距离，scale由路网保证一致性，
+    因此节点出堆时即为最短距离
+    
+    Args:
+        indptr, indices, link_idx: 路网CSR结构
+        weights: 各路段权重（按路段下标）
+        coords: 节点坐标数组 (节点数, 2)
+        scale: 启发函数系数，为0时退化为Dijkstra
+        src: 起点编号
+        dst: 终点编号
+    
+    Returns:
+        (距离数组, 前驱节点数组, 前驱路段数组)
+    """
+    n = indptr.shape[0] - 1
+    dist = np.full(n, np.inf)
+    priority = np.full(n, np.inf)
+    prev_node = np.full(n, -1, dtype=np.int32)
+    prev_link = np.full(n, -1, dtype=np.int32)
+    
+    heap = np.empty(n, dtype=np.int32)
+    pos = np.full(n, _NOT_IN_HEAP, dtype=np.int32)
+    
+    dst_x = coords[dst, 0]
+    dst_y = coords[dst, 1]
+    
+    dist[src] = 0.0
+    priority[src] = scale * np.hypot(coords[src, 0] - dst_x, coords[src, 1] - dst_y)
+    heap[0] = src
+    pos[src] = 0
+    size = 1
+    
+    while size > 0:
+        u = heap[0]
+        pos[u] = _SETTLED
+        size -= 1
+        if size > 0:
+            heap[0] = heap[size]
+            _sift_down(heap, pos, priority, 0, size)
+        
+        if u == dst:
+            break
+        
+        current_dist = dist[u]
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            if pos[v] == _SETTLED:
+                continue
+            new_dist = current_dist + weights[link_idx[e]]
+            if new_dist < dist[v]:
+                dist[v] = new_dist
+                priority[v] = new_dist + scale * np.hypot(coords[v, 0] - dst_x, coords[v, 1] - dst_y)
+                prev_node[v] = u
+                prev_link[v] = link_idx[e]
+                if pos[v] == _NOT_IN_HEAP:
+                    heap[size] = v
+                    size += 1
+                    _sift_up(heap, pos, priority, size - 1)
+                else:
+                    _sift_up(heap, pos, priority, pos[v])
+    
+    return dist, prev_node, prev_link
+
+
+def dijkstra_sssp(
+    network: Network,
+    origin_idx: int,
+    weights: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    按节点编号计算从起点出发到所有节点的最短路树（单源最短路）
+    
+    Args:
+        network: 路网对象
+        origin_idx: 起点节点编号（见network.node_index）
+        weights: 路段权重数组，默认使用当前流量下的行程时间
+    
+    Returns:
+        (距离数组, 前驱节点数组, 前驱路段数组)，按节点编号索引。
+        使用当前行程时间时结果会被缓存，返回的数组为只读
+    
+    Raises:
+        ValueError: 起点编号超出节点编号范围
+    """
+    network.ensure_arrays()
+    # Numba内核不做越界检查，负数编号也不能按Python惯例从末尾索引
+    if not 0 <= origin_idx < len(network.node_names):
+        raise ValueError(f"Origin index out of range: {origin_idx}")
+    if weights is None:
+        weights = network.current_times
+    
+    # 权重即当前行程时间时，同一权重版本下的最短路树可以复用
+    use_cache = weights is network.current_times
+    if use_cache:
+        cached = network.get_cached_tree(origin_idx)
+        if cached is not None:
+            return cached
+    
+    tree = _dijkstra_csr(
+        network.indptr, network.indices, network.link_idx, weights, origin_idx, -1
+    )
+    if use_cache:
+        for arr in tree:
+            arr.setflags(write=False)
+        network.cache_tree(origin_idx, tree)
+    return tree
+
+
+def shortest_path_tree(
+    network: Network,
+    origin: str,
+    weights: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    计算从起点出发到所有节点的最短路树
+    
+    Args:
+        network: 路网对象
+        origin: 起点节点（必须存在于路网中）
+        weights: 路段权重数组，默认使用当前流量下的行程时间
+    
+    Returns:
+        (距离数组, 前驱节点数组, 前驱路段数组)，按节点编号索引。
+        使用当前行程时间时结果会被缓存，返回的数组为只读
+    """
+    network.ensure_arrays()
+    return dijkstra_sssp(network, network.node_index[origin], weights)
+
+
+def reconstruct_path(network: Network, prev_node: np.ndarray, destination: str) -> List[str]:
+    """
+    沿前驱数组回溯得到节点路径
+    
+    Args:
+        network: 路网对象
+        prev_node: 前驱节点数组
+        destination: 终点节点
+    
+    Returns:
+        路径节点列表（起点在前）
+    """
+    path = []
+    current = network.node_index[destination]
+    while current != -1:
+        path.append(network.node_names[current])
+        current = prev_node[current]
+    
+    path.reverse()
+    return path
+
+
 def shortest_path(
     network: Network,
     origin: str,
     destination: str
 ) -> Tuple[Optional[List[str]], float]:
     """
-    使用Dijkstra算法计算最短路径
+    使用A*算法计算最短路径（启发函数为直线距离下的自由流时间下界）
     
     基于当前路段流量计算的travel_time作为权重
     
@@ -35,67 +297,43 @@ def shortest_path(
     if origin == destination:
         return ([origin], 0.0)
     
+    network.ensure_arrays()
+    
     # 检查节点是否存在
-    if origin not in network.nodes or destination not in network.nodes:
+    if origin not in network.node_index or destination not in network.node_index:
         return (None, float('inf'))
     
-    # 初始化
-    distances: Dict[str, float] = {node: float('inf') for node in network.nodes}
-    distances[origin] = 0.0
+    # 权重未变化时直接复用缓存结果
+    cached = network.get_cached_path(origin, destination)
+    if cached is not None:
+        path, cost = cached
+        return (list(path) if path is not None else None, cost)
     
-    previous: Dict[str, Optional[str]] = {node: None for node in network.nodes}
+    src = network.node_index[origin]
+    dst = network.node_index[destination]
     
-    # 优先队列：(距离, 节点)
-    pq = [(0.0, origin)]
-    visited = set()
+    # 已有该起点的最短路树时直接读取；同一起点被再次查询时，计算并缓存整棵最短路树，
+    # 供该起点的其余终点复用；否则单对查询使用A*，以节点坐标的直线距离剪枝搜索范围
+    tree = network.get_cached_tree(src)
+    if tree is None and network.mark_origin_queried(src):
+        tree = shortest_path_tree(network, origin)
+    if tree is not None:
+        dist, prev_node, _ = tree
+    else:
+        dist, prev_node, _ = _astar_csr(
+            network.indptr, network.indices, network.link_idx,
+            network.current_times, network.coord_arr,
+            network.heuristic_scale, src, dst
+        )
     
-    while pq:
-        current_dist, current_node = heapq.heappop(pq)
-        
-        # 已访问过，跳过
-        if current_node in visited:
-            continue
-        
-        visited.add(current_node)
-        
-        # 到达目标节点
-        if current_node == destination:
-            break
-        
-        # 当前距离已不是最优，跳过
-        if current_dist > distances[current_node]:
-            continue
-        
-        # 遍历邻居节点
-        for neighbor, link_id in network.get_neighbors(current_node):
-            if neighbor in visited:
-                continue
-            
-            link = network.links[link_id]
-            # 使用当前流量计算行程时间作为权重
-            travel_time = link.get_travel_time()
-            new_dist = current_dist + travel_time
-            
-            # 找到更短路径
-            if new_dist < distances[neighbor]:
-                distances[neighbor] = new_dist
-                previous[neighbor] = current_node
-                heapq.heappush(pq, (new_dist, neighbor))
-    
-    # 重建路径
-    if distances[destination] == float('inf'):
-        # 路径不存在
-        return (None, float('inf'))
-    
-    path = []
-    current = destination
-    while current is not None:
-        path.append(current)
-        current = previous[current]
-    
-    path.reverse()
+    # 路径不存在
+    if dist[dst] == np.inf:
+        path, cost = None, float('inf')
+    else:
+        path, cost = reconstruct_path(network, prev_node, destination), float(dist[dst])
     
-    return (path, distances[destination])
+    network.cache_path(origin, destination, path, cost)
+    return (list(path) if path is not None else None, cost)
 
 
 def get_path_links(network: Network, path: List[str]) -> List[Link]:
@@ -1,15 +1,15 @@
 """Frank-Wolfe用户均衡分配算法"""
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Union
 import sys
 import os
-import copy
+import numpy as np
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from models.network import Network
 from models.demand import Demand
-from .all_or_nothing import all_or_nothing_assignment
-from evaluation.metrics import calculate_relative_gap, calculate_total_travel_time
+from .all_or_nothing import assign_od_arrays, od_arrays
+from evaluation.metrics import calculate_relative_gap_from_sptt
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -42,33 +42,37 @@ def frank_wolfe_assignment(
     Returns:
         (各路段流量字典, 收敛历史记录列表)
     """
-    logger.info(f"开始Frank-Wolfe分配，最大迭代: {max_iter}, 收敛阈值: {epsilon}")
+    logger.info("开始Frank-Wolfe分配，最大迭代: %d, 收敛阈值: %s", max_iter, epsilon)
     
     # 步骤1: 初始化 - 全有全无分配
     network.reset_flows()
-    initial_flows = all_or_nothing_assignment(network, demand)
+    origins, destinations, amounts = od_arrays(network, demand)
+    current_flows, _ = assign_od_arrays(network, origins, destinations, amounts)
     
     # 更新路网流量
-    for link_id, flow in initial_flows.items():
-        network.links[link_id].update_flow(flow)
-    
-    current_flows = copy.deepcopy(initial_flows)
+    network.set_flows(current_flows)
     
     # 收敛历史
     history = []
     
     # 迭代
     for iteration in range(1, max_iter + 1):
-        logger.info(f"Frank-Wolfe 迭代 {iteration}/{max_iter}")
+        logger.info("Frank-Wolfe 迭代 %d/%d", iteration, max_iter)
         
         # 步骤2a: 基于当前流量，全有全无分配得到辅助流量
-        auxiliary_flows = all_or_nothing_assignment(network, demand)
+        # 当前流量下的路段行程时间，供最短路与总出行时间共用
+        travel_times = network.current_times
         
-        # 步骤2b: 计算相对间隙
-        relative_gap = calculate_relative_gap(network, auxiliary_flows)
+        # 同时得到最短路总出行时间SPTT
+        auxiliary_flows, sptt = assign_od_arrays(
+            network, origins, destinations, amounts, travel_times
+        )
         
         # 计算当前总出行时间
-        total_time = calculate_total_travel_time(network)
+        total_time = float(np.dot(network.flow_arr, travel_times))
+        
+        # 步骤2b: 计算相对间隙
+        relative_gap = calculate_relative_gap_from_sptt(total_time, sptt)
         
         # 记录历史
         history.append({
@@ -77,37 +81,32 @@ def frank_wolfe_assignment(
             'total_travel_time': total_time
         })
         
-        logger.info(f"迭代 {iteration}: 相对间隙={relative_gap:.6f}, 总出行时间={total_time:.2f}")
+        logger.info("迭代 %d: 相对间隙=%.6f, 总出行时间=%.2f", iteration, relative_gap, total_time)
         
         # 步骤2e: 检查收敛
         if relative_gap < epsilon:
-            logger.info(f"算法收敛！相对间隙 {relative_gap:.6f} < {epsilon}")
+            logger.info("算法收敛！相对间隙 %.6f < %s", relative_gap, epsilon)
             break
         
         # 步骤2c: 线搜索找最优步长α
         alpha = line_search(network, current_flows, auxiliary_flows)
         
-        logger.debug(f"线搜索步长: α={alpha:.6f}")
+        logger.debug("线搜索步长: α=%.6f", alpha)
         
         # 步骤2d: 更新流量
-        for link_id in network.links:
-            old_flow = current_flows.get(link_id, 0.0)
-            aux_flow = auxiliary_flows.get(link_id, 0.0)
-            new_flow = old_flow + alpha * (aux_flow - old_flow)
-            
-            current_flows[link_id] = new_flow
-            network.links[link_id].update_flow(new_flow)
+        current_flows += alpha * (auxiliary_flows - current_flows)
+        network.set_flows(current_flows)
     
     logger.info("Frank-Wolfe分配完成")
     
-    return current_flows, history
+    return network.array_to_flows(current_flows), history
 
 
 def line_search(
     network: Network,
-    current_flows: Dict[str, float],
-    auxiliary_flows: Dict[str, float],
-    n_samples: int = 20
+    current_flows: Union[Dict[str, float], np.ndarray],
+    auxiliary_flows: Union[Dict[str, float], np.ndarray],
+    tolerance: float = 1e-6
 ) -> float:
     """
     线搜索找最优步长α
@@ -115,44 +114,51 @@ def line_search(
     寻找使目标函数最小的α ∈ [0, 1]
     目标函数: Z(α) = Σ ∫[0 to x_a(α)] t_a(w) dw
     
-    近似方法：在[0, 1]之间采样，选择使总出行时间最小的α
+    Z(α)为凸函数，其导数为
+    dZ/dα = Σ (y_a - x_a) * t_a(x_a + α(y_a - x_a))
+    对导数二分求零点即得最优α
     
     Args:
         network: 路网对象
-        current_flows: 当前流量字典
-        auxiliary_flows: 辅助流量字典
-        n_samples: 采样点数量
+        current_flows: 当前流量（字典或数组）
+        auxiliary_flows: 辅助流量（字典或数组）
+        tolerance: 收敛精度（区间宽度与导数绝对值）
     
     Returns:
         最优步长α
     """
-    best_alpha = 0.0
-    best_objective = float('inf')
-    
-    # 在[0, 1]之间采样
-    alphas = [i / n_samples for i in range(n_samples + 1)]
-    
-    for alpha in alphas:
-        # 计算该α下的流量
-        test_flows = {}
-        for link_id in network.links:
-            old_flow = current_flows.get(link_id, 0.0)
-            aux_flow = auxiliary_flows.get(link_id, 0.0)
-            test_flows[link_id] = old_flow + alpha * (aux_flow - old_flow)
-        
-        # 计算目标函数值（近似为总出行时间）
-        objective = calculate_objective(network, test_flows)
-        
-        if objective < best_objective:
-            best_objective = objective
-            best_alpha = alpha
-    
-    return best_alpha
+    x = network.flows_to_array(current_flows)
+    d = network.flows_to_array(auxiliary_flows) - x
+    t0 = network.t0_arr
+    cap = network.cap_arr
+    
+    def derivative(alpha: float) -> float:
+        ratio = 1.0 + (x + alpha * d) / cap
+        return float(np.dot(d, t0 * ratio * ratio))
+    
+    # 导数在端点不变号时最优解位于端点
+    if derivative(0.0) >= 0:
+        return 0.0
+    if derivative(1.0) <= 0:
+        return 1.0
+    
+    low, high = 0.0, 1.0
+    while high - low > tolerance:
+        mid = (low + high) / 2
+        slope = derivative(mid)
+        if abs(slope) < tolerance:
+            return mid
+        if slope < 0:
+            low = mid
+        else:
+            high = mid
+    
+    return (low + high) / 2
 
 
 def calculate_objective(
     network: Network,
-    flows: Dict[str, float]
+    flows: Union[Dict[str, float], np.ndarray]
 ) -> float:
     """
     计算目标函数值
@@ -160,37 +166,23 @@ def calculate_objective(
     目标函数: Z = Σ ∫[0 to x_a] t_a(w) dw
     
     对于BPR函数 t(x) = t0 * (1 + x/cap)^2
-    积分结果: ∫ t(x) dx = t0 * [x + x^2/(2*cap) + x^3/(3*cap^2)]
-    
-    简化计算：使用 Z ≈ Σ x_a * t_a(x_a)
+    积分结果: ∫ t(x) dx = t0 * [x + x^2/cap + x^3/(3*cap^2)]
     
     Args:
         network: 路网对象
-        flows: 流量字典
+        flows: 流量字典 {link_id: flow}，或与link_index对齐的数组
     
     Returns:
         目标函数值
     """
-    objective = 0.0
-    
-    for link_id, link in network.links.items():
-        flow = flows.get(link_id, 0.0)
-        if flow > 0:
-            # 计算该流量下的行程时间
-            travel_time = link.get_travel_time(flow)
-            
-            # BPR积分的精确计算
-            t0 = link.get_free_flow_time()
-            cap = link.capacity
-            
-            # ∫[0 to x] t0*(1+w/cap)^2 dw = t0*[w + w^2/(2*cap) + w^3/(3*cap^2)]
-            integral = t0 * (
-                flow +
-                flow**2 / (2 * cap) +
-                flow**3 / (3 * cap**2)
-            )
-            
-            objective += integral
-    
-    return objective
-
+    flow = network.flows_to_array(flows)
+    cap = network.cap_arr
+    
+    # ∫[0 to x] t0*(1+w/cap)^2 dw = t0*[w + w^2/cap + w^3/(3*cap^2)]
+    integral = network.t0_arr * (
+        flow +
+        flow * flow / cap +
+        flow ** 3 / (3 * cap * cap)
+    )
+    
+    return float(integral.sum())
@@ -7,7 +7,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from models.network import Network
 from models.demand import Demand
-from .all_or_nothing import all_or_nothing_assignment
+from .all_or_nothing import assign_od_arrays, od_arrays
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -32,7 +32,7 @@ def incremental_assignment(
     Returns:
         各路段流量字典 {link_id: flow}
     """
-    logger.info(f"开始增量分配，迭代次数: {n_iterations}")
+    logger.info("开始增量分配，迭代次数: %d", n_iterations)
     
     # 重置路网流量
     network.reset_flows()
@@ -45,34 +45,21 @@ def incremental_assignment(
         # 均匀分配
         fractions = [1.0 / n_iterations] * n_iterations
     
-    # 累积流量
-    total_flows: Dict[str, float] = {link_id: 0.0 for link_id in network.links}
+    # OD数组只需构建一次，每次迭代按比例缩放需求量
+    origins, destinations, amounts = od_arrays(network, demand)
     
     # 迭代分配
     for iteration, fraction in enumerate(fractions, 1):
-        logger.info(f"增量分配迭代 {iteration}/{n_iterations}, 需求比例: {fraction*100:.1f}%")
+        logger.info("增量分配迭代 %d/%d, 需求比例: %.1f%%", iteration, n_iterations, fraction * 100)
         
-        # 创建当前迭代的需求
-        current_demand = Demand()
-        for origin, destination, amount in demand.get_od_pairs():
-            current_demand.od_pairs.append((origin, destination, amount * fraction))
+        # 全有全无分配当前比例的需求
+        iteration_flows, _ = assign_od_arrays(network, origins, destinations, amounts * fraction)
         
-        # 全有全无分配
-        iteration_flows = all_or_nothing_assignment(network, current_demand)
-        
-        # 累加流量
-        for link_id, flow in iteration_flows.items():
-            total_flows[link_id] += flow
-        
-        # 更新路网流量（用于下一次迭代的最短路径计算）
-        for link_id, flow in total_flows.items():
-            network.links[link_id].update_flow(flow)
-        
-        # 记录当前路网总出行时间
-        total_time = network.get_total_travel_time()
-        logger.info(f"迭代 {iteration} 完成，当前总出行时间: {total_time:.2f}")
+        # 累加到路网流量（用于下一次迭代的最短路径计算），同时得到当前路网总出行时间
+        total_time = network.update_flows_and_total_time(iteration_flows)
+        logger.info("迭代 %d 完成，当前总出行时间: %.2f", iteration, total_time)
     
     logger.info("增量分配完成")
     
-    return total_flows
+    return network.array_to_flows(network.flow_arr)
 
@@ -1,5 +1,13 @@
 """Evaluation metrics for traffic assignment"""
-from .metrics import calculate_total_travel_time, calculate_relative_gap
+from .metrics import (
+    calculate_total_travel_time,
+    calculate_relative_gap,
+    calculate_relative_gap_from_sptt
+)
 
-__all__ = ['calculate_total_travel_time', 'calculate_relative_gap']
+__all__ = [
+    'calculate_total_travel_time',
+    'calculate_relative_gap',
+    'calculate_relative_gap_from_sptt'
+]
 
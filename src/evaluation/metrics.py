@@ -1,7 +1,8 @@
 """评估指标计算"""
-from typing import Dict
+from typing import Dict, Union
 import sys
 import os
+import numpy as np
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
@@ -25,7 +26,7 @@ def calculate_total_travel_time(network: Network) -> float:
 
 def calculate_relative_gap(
     network: Network,
-    auxiliary_flows: Dict[str, float]
+    auxiliary_flows: Union[Dict[str, float], np.ndarray]
 ) -> float:
     """
     计算Frank-Wolfe算法的相对间隙
@@ -39,25 +40,19 @@ def calculate_relative_gap(
     
     Args:
         network: 路网对象（包含当前流量）
-        auxiliary_flows: 辅助流量字典 {link_id: flow}
+        auxiliary_flows: 辅助流量字典 {link_id: flow}，或与link_index对齐的数组
     
     Returns:
         相对间隙（0到1之间的值）
     """
-    # 计算分子和分母
-    numerator = 0.0  # Σ(x_a * t_a(x))
-    denominator = 0.0  # Σ(y_a * t_a(x))
-    
-    for link_id, link in network.links.items():
-        # 基于当前流量计算行程时间
-        travel_time = link.get_travel_time()
-        
-        # 当前流量的贡献
-        numerator += link.flow * travel_time
-        
-        # 辅助流量的贡献
-        auxiliary_flow = auxiliary_flows.get(link_id, 0.0)
-        denominator += auxiliary_flow * travel_time
+    aux = network.flows_to_array(auxiliary_flows)
+    flow = network.flow_arr
+    
+    # 基于当前流量的行程时间（路网按权重版本缓存，分子分母共用）
+    travel_time = network.current_times
+    
+    numerator = float(np.dot(flow, travel_time))  # Σ(x_a * t_a(x))
+    denominator = float(np.dot(aux, travel_time))  # Σ(y_a * t_a(x))
     
     # 避免除零
     if numerator < 1e-10:
@@ -69,27 +64,50 @@ def calculate_relative_gap(
     return relative_gap
 
 
-def calculate_link_performance(network: Network) -> Dict[str, Dict[str, float]]:
+def calculate_relative_gap_from_sptt(total_travel_time: float, sptt: float) -> float:
+    """
+    由总出行时间与最短路总出行时间计算相对间隙
+    
+    相对间隙 = |TSTT - SPTT| / TSTT
+    
+    其中SPTT = Σ(y_a * t_a(x))可在全有全无分配时顺带累计，
+    与calculate_relative_gap结果一致
+    
+    Args:
+        total_travel_time: 当前总出行时间 TSTT = Σ(x_a * t_a(x))
+        sptt: 最短路总出行时间
+    
+    Returns:
+        相对间隙
+    """
+    # 避免除零
+    if total_travel_time < 1e-10:
+        return 0.0
+    
+    return abs(total_travel_time - sptt) / total_travel_time
+
+
+def calculate_link_performance(network: Network) -> Dict[str, np.ndarray]:
     """
     计算各路段的性能指标
     
+    结果按列存储，各数组与network.link_index对齐
+    
     Args:
         network: 路网对象
     
     Returns:
-        路段性能字典 {link_id: {'flow': x, 'capacity': c, 'ratio': x/c, 'travel_time': t}}
+        路段性能字典 {'link_ids': 路段ID, 'flow': x, 'capacity': c, 'ratio': x/c,
+        'travel_time': t, 'free_flow_time': t0}，各值均为数组
     """
-    performance = {}
-    
-    for link_id, link in network.links.items():
-        ratio = link.flow / link.capacity if link.capacity > 0 else 0.0
-        performance[link_id] = {
-            'flow': link.flow,
-            'capacity': link.capacity,
-            'ratio': ratio,
-            'travel_time': link.get_travel_time(),
-            'free_flow_time': link.get_free_flow_time()
-        }
-    
-    return performance
-
+    network.ensure_arrays()
+    flow = network.flow_arr.copy()
+    
+    return {
+        'link_ids': np.array(list(network.link_index), dtype=str),
+        'flow': flow,
+        'capacity': network.cap_arr.copy(),
+        'ratio': flow / network.cap_arr,
+        'travel_time': network.current_times.copy(),
+        'free_flow_time': network.t0_arr.copy()
+    }
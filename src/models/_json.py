@@ -0,0 +1,145 @@
+"""JSON文件读取（orjson可选加速）"""
+import json
+import os
+from typing import Any, Dict, List
+
+# orjson为可选依赖，解析速度明显快于标准库json，未安装时回退
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# pysimdjson为可选依赖，支持按需解析，只将用到的字段转换为Python对象；
+# 整体速度不及orjson，仅在未安装orjson时使用
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+# ijson为可选依赖，流式解析大文件，不必先读入整个文件并构建完整的对象树
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# 文件不小于该字节数且安装了ijson时，load_json_fields改为流式解析
+STREAM_MIN_BYTES = 10 * 1024 * 1024
+
+
+def load_json(filepath: str) -> Any:
+    """
+    读取并解析JSON文件
+    
+    Args:
+        filepath: JSON文件路径
+    
+    Returns:
+        解析结果
+    
+    Raises:
+        FileNotFoundError: 文件不存在
+        json.JSONDecodeError: JSON格式错误（orjson的解析错误同为其子类）
+    """
+    if orjson is not None:
+        with open(filepath, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_json_fields(filepath: str, fields: Dict[str, List[str]]) -> Dict[str, Any]:
+    """
+    读取JSON文件中指定的二级字段
+    
+    文件不小于STREAM_MIN_BYTES且安装了ijson时流式解析，只收集fields中列出的字段；
+    否则安装了orjson时完整解析（返回结果可能包含其他字段）；未安装orjson而安装了
+    pysimdjson时按需解析，只有fields中列出的字段会被转换为Python对象；
+    均未安装时使用标准库json完整解析。不存在的字段不会出现在结果中
+    
+    Args:
+        filepath: JSON文件路径
+        fields: 需要读取的字段 {一级键: [二级键, ...]}
+    
+    Returns:
+        解析结果 {一级键: {二级键: 值}}
+    
+    Raises:
+        FileNotFoundError: 文件不存在
+        json.JSONDecodeError: JSON格式错误
+    """
+    if ijson is not None and os.path.getsize(filepath) >= STREAM_MIN_BYTES:
+        return _stream_json_fields(filepath, fields)
+    if orjson is not None or simdjson is None:
+        return load_json(filepath)
+    
+    with open(filepath, 'rb') as f:
+        raw = f.read()
+    try:
+        doc = simdjson.Parser().parse(raw)
+    except ValueError as e:
+        raise json.JSONDecodeError(str(e), '', 0) from e
+    
+    result = {}
+    for section, keys in fields.items():
+        if section not in doc:
+            continue
+        obj = doc[section]
+        result[section] = {}
+        for key in keys:
+            if key in obj:
+                value = obj[key]
+                result[section][key] = value.as_list() if isinstance(value, simdjson.Array) else value
+    return result
+
+
+def _stream_json_fields(filepath: str, fields: Dict[str, List[str]]) -> Dict[str, Any]:
+    """
+    用ijson单次流式遍历文件，收集指定的数组字段
+    
+    数组元素为标量时直接收集；为数组或对象时（如 ["AA", "B"] 形式的路段端点）
+    整体构建为Python对象。内存占用只与收集到的字段成正比，与文件大小无关
+    
+    Args:
+        filepath: JSON文件路径
+        fields: 需要读取的字段 {一级键: [二级键, ...]}
+    
+    Returns:
+        解析结果 {一级键: {二级键: 值列表}}
+    
+    Raises:
+        FileNotFoundError: 文件不存在
+        json.JSONDecodeError: JSON格式错误
+    """
+    # ijson事件前缀形如 "links.between"，数组元素的前缀为 "links.between.item"
+    wanted = {f"{section}.{key}": (section, key) for section, keys in fields.items() for key in keys}
+    scalar_events = ('string', 'number', 'boolean', 'null')
+    result: Dict[str, Any] = {}
+    column = None
+    column_prefix = item_prefix = None
+    # 正在构建的非标量数组元素
+    builder = None
+    
+    with open(filepath, 'rb') as f:
+        try:
+            for prefix, event, value in ijson.parse(f, use_float=True):
+                if builder is not None:
+                    builder.event(event, value)
+                    if prefix == item_prefix and event in ('end_array', 'end_map'):
+                        column.append(builder.value)
+                        builder = None
+                elif column is not None:
+                    if prefix == item_prefix:
+                        if event in scalar_events:
+                            column.append(value)
+                        else:
+                            builder = ijson.ObjectBuilder()
+                            builder.event(event, value)
+                    elif prefix == column_prefix and event == 'end_array':
+                        column = None
+                elif event == 'start_array' and prefix in wanted:
+                    section, key = wanted[prefix]
+                    column = result.setdefault(section, {})[key] = []
+                    column_prefix, item_prefix = prefix, prefix + '.item'
+        except ijson.JSONError as e:
+            raise json.JSONDecodeError(str(e), '', 0) from e
+    return result
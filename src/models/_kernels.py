@@ -0,0 +1,35 @@
+"""路网数值计算的Numba内核"""
+from numba import njit
+
+
+@njit(cache=True)
+def _bpr_total(flow, t0, cap):
+    """
+    单次遍历计算总出行时间 Σ flow × t0 × (1 + flow/cap)²
+    
+    流量不为正的路段不计入，与逐路段累加的结果一致
+    """
+    total = 0.0
+    for i in range(flow.shape[0]):
+        q = flow[i]
+        if q > 0.0:
+            congestion = 1.0 + q / cap[i]
+            total += q * t0[i] * congestion * congestion
+    return total
+
+
+@njit(cache=True)
+def _add_flows_bpr_total(flow, delta, t0, cap):
+    """
+    原地累加流量 flow += delta，并在同一遍历中计算累加后的总出行时间
+    
+    流量不为正的路段不计入，与_bpr_total一致
+    """
+    total = 0.0
+    for i in range(flow.shape[0]):
+        q = flow[i] + delta[i]
+        flow[i] = q
+        if q > 0.0:
+            congestion = 1.0 + q / cap[i]
+            total += q * t0[i] * congestion * congestion
+    return total
@@ -0,0 +1,80 @@
+"""已解析数据的pickle旁路缓存（sidecar）"""
+import os
+import pickle
+from typing import Any, Optional
+
+# 缓存格式版本号，Network/Link/Demand的属性或__slots__布局变化时须递增，
+# 使旧布局写入的缓存失效
+SIDECAR_VERSION = 3
+
+
+def sidecar_path(filepath: str) -> str:
+    """
+    数据文件对应的缓存文件路径
+    
+    Args:
+        filepath: 数据文件路径
+    
+    Returns:
+        缓存文件路径（数据文件路径加.pkl后缀）
+    """
+    return filepath + '.pkl'
+
+
+def _file_key(filepath: str) -> tuple:
+    """以缓存格式版本号、数据文件修改时间和大小作为缓存键"""
+    stat = os.stat(filepath)
+    return (SIDECAR_VERSION, stat.st_mtime_ns, stat.st_size)
+
+
+def load_sidecar(filepath: str) -> Optional[Any]:
+    """
+    读取数据文件的缓存对象
+    
+    缓存文件中记录了写入时的缓存格式版本号及数据文件的修改时间和大小，
+    三者均与当前一致才视为命中
+    
+    Args:
+        filepath: 数据文件路径
+    
+    Returns:
+        缓存的对象，缓存不存在、已过期或无法读取时返回None
+    """
+    try:
+        key = _file_key(filepath)
+        with open(sidecar_path(filepath), 'rb') as f:
+            cached_key, obj = pickle.load(f)
+    except Exception:
+        # 缓存缺失、损坏或由不兼容的旧版本写入，一律视为未命中
+        return None
+    return obj if cached_key == key else None
+
+
+def save_sidecar(filepath: str, obj: Any) -> None:
+    """
+    将对象写入数据文件的缓存
+    
+    先写临时文件再原子替换，避免并发读取到不完整的缓存；写入失败（目录不可写、对象无法
+    序列化等）时静默跳过，并清理临时文件
+    
+    Args:
+        filepath: 数据文件路径
+        obj: 需要缓存的对象
+    """
+    path = sidecar_path(filepath)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        key = _file_key(filepath)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((key, obj), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception:
+        # 缓存只是加速手段，任何写入失败（包括对象不可序列化时抛出的TypeError等）
+        # 都不影响加载结果
+        pass
+    finally:
+        # 替换成功后临时文件已不存在；失败时清理残留的临时文件
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
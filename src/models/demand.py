@@ -1,6 +1,11 @@
 """交通需求（Demand）数据模型"""
 import json
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ._json import load_json
+from ._sidecar import load_sidecar, save_sidecar
 
 
 class Demand:
@@ -8,27 +13,41 @@ class Demand:
     交通需求类，管理OD需求对
     
     Attributes:
-        od_pairs: OD对列表 [(起点, 终点, 需求量), ...]
+        od_pairs: OD对列表 [(起点, 终点, 需求量), ...]。修改时应整体替换
+            （demand.od_pairs = [...]）；原地替换或删改其中的元素不会使
+            get_od_arrays()的缓存失效（仅长度变化能被察觉）
     """
     
     def __init__(self):
         """初始化空需求"""
         self.od_pairs: List[Tuple[str, str, float]] = []
+        
+        # OD对的并行数组缓存 (起点列表, 终点列表, 需求量数组)，由get_od_arrays()构建
+        self._od_arrays: Optional[Tuple[List[str], List[str], np.ndarray]] = None
+        self._synced_pairs: Optional[List[Tuple[str, str, float]]] = None
     
-    def load_from_json(self, filepath: str) -> None:
+    def load_from_json(self, filepath: str, use_cache: bool = False) -> None:
         """
         从JSON文件加载需求数据
         
         Args:
             filepath: JSON文件路径
+            use_cache: 是否使用pickle旁路缓存（filepath.pkl）。缓存有效时直接恢复，
+                否则正常解析后写入缓存。缓存以pickle读取，只应对可信的数据目录开启
         
         Raises:
             FileNotFoundError: 文件不存在
             ValueError: 数据格式错误
         """
+        if use_cache:
+            cached = load_sidecar(filepath)
+            if isinstance(cached, tuple):
+                origins, destinations, amounts = cached
+                self._set_columns(origins, destinations, amounts, np.asarray(amounts, dtype=np.float64))
+                return
+        
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_json(filepath)
         except FileNotFoundError as e:
             raise FileNotFoundError(f"Demand file not found: {filepath}") from e
         except json.JSONDecodeError as e:
@@ -43,14 +62,39 @@ class Demand:
             if not (len(origins) == len(destinations) == len(amounts)):
                 raise ValueError("Length mismatch in demand data")
             
-            self.od_pairs = []
-            for origin, destination, amount in zip(origins, destinations, amounts):
-                if amount < 0:
-                    raise ValueError(f"Negative demand amount: {amount}")
-                self.od_pairs.append((origin, destination, amount))
+            amount_arr = np.asarray(amounts, dtype=np.float64)
+            negative = np.flatnonzero(amount_arr < 0)
+            if len(negative):
+                raise ValueError(f"Negative demand amount: {amounts[negative[0]]}")
+            
+            self._set_columns(list(origins), list(destinations), amounts, amount_arr)
         
         except KeyError as e:
             raise ValueError(f"Missing required field in demand data: {e}") from e
+        
+        if use_cache:
+            # 缓存只保存三列原始数据，od_pairs和需求量数组在恢复时重新组装
+            save_sidecar(filepath, (list(origins), list(destinations), amounts))
+    
+    def _set_columns(
+        self,
+        origins: List[str],
+        destinations: List[str],
+        amounts: List[float],
+        amount_arr: np.ndarray
+    ) -> None:
+        """
+        由起点、终点和需求量三列设置od_pairs及其并行数组缓存
+        
+        Args:
+            origins: 起点列表
+            destinations: 终点列表
+            amounts: 需求量列表（保留原始数值类型）
+            amount_arr: 与amounts对应的需求量数组
+        """
+        self.od_pairs = list(zip(origins, destinations, amounts))
+        self._od_arrays = (origins, destinations, amount_arr)
+        self._synced_pairs = self.od_pairs
     
     def get_od_pairs(self) -> List[Tuple[str, str, float]]:
         """
@@ -61,6 +105,27 @@ class Demand:
         """
         return self.od_pairs
     
+    def get_od_arrays(self) -> Tuple[List[str], List[str], np.ndarray]:
+        """
+        获取OD对的并行数组，按od_pairs顺序对齐
+        
+        od_pairs被整体替换或长度变化后自动重建；原地修改元素不会被察觉，
+        应改为整体替换od_pairs
+        
+        Returns:
+            (起点列表, 终点列表, 需求量数组)
+        """
+        if (self._synced_pairs is not self.od_pairs
+                or len(self._od_arrays[0]) != len(self.od_pairs)):
+            n = len(self.od_pairs)
+            self._od_arrays = (
+                [origin for origin, _, _ in self.od_pairs],
+                [destination for _, destination, _ in self.od_pairs],
+                np.fromiter((amount for _, _, amount in self.od_pairs), dtype=np.float64, count=n)
+            )
+            self._synced_pairs = self.od_pairs
+        return self._od_arrays
+    
     def get_total_demand(self) -> float:
         """
         获取总需求量
@@ -68,7 +133,7 @@ class Demand:
         Returns:
             总需求量
         """
-        return sum(amount for _, _, amount in self.od_pairs)
+        return float(self.get_od_arrays()[2].sum())
     
     def __repr__(self) -> str:
         """字符串表示"""
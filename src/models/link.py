@@ -12,9 +12,15 @@ class Link:
         length: 路段长度
         capacity: 路段通行能力
         speed_max: 最大速度（限速）
-        flow: 当前流量
+        flow: 当前流量（绑定路网后直接读写路网的flow_arr）
+        idx: 路段在所属路网数组中的下标，未绑定时为-1
     """
     
+    __slots__ = (
+        'from_node', 'to_node', 'length', 'capacity', 'speed_max',
+        '_flow', '_t0', '_inv_cap', '_network', 'idx', '_id'
+    )
+    
     def __init__(
         self,
         from_node: str,
@@ -34,13 +40,64 @@ class Link:
             capacity: 路段通行能力（cap）
             speed_max: 最大速度/限速（spd）
             flow: 初始流量，默认为0
+        
+        Raises:
+            ValueError: 通行能力或限速不为正
         """
+        if capacity <= 0:
+            raise ValueError(f"Invalid capacity for link {from_node}{to_node}: {capacity}")
+        if speed_max <= 0:
+            raise ValueError(f"Invalid speed limit for link {from_node}{to_node}: {speed_max}")
+        
         self.from_node = from_node
         self.to_node = to_node
         self.length = length
         self.capacity = capacity
         self.speed_max = speed_max
-        self.flow = flow
+        
+        # 路段ID在构造时拼接一次，常用作字典键
+        self._id = f"{from_node}{to_node}"
+        
+        # 预计算自由流时间与通行能力倒数，避免在最短路等内层循环中重复除法
+        self._t0 = length / speed_max
+        self._inv_cap = 1.0 / capacity
+        
+        # 所属路网及其在路网数组中的下标（由Network绑定）
+        self._network = None
+        self.idx = -1
+        self._flow = flow
+    
+    @property
+    def flow(self) -> float:
+        """当前流量，绑定路网后即路网flow_arr中对应元素"""
+        if self._network is not None:
+            return float(self._network.flow_arr[self.idx])
+        return self._flow
+    
+    @flow.setter
+    def flow(self, flow: float) -> None:
+        if self._network is not None:
+            self._network.flow_arr[self.idx] = flow
+            self._network.bump_weight_version()
+        else:
+            self._flow = flow
+    
+    def bind(self, network, idx: int) -> None:
+        """
+        将路段绑定到路网的属性数组
+        
+        Args:
+            network: 所属路网对象
+            idx: 路段在路网数组中的下标
+        """
+        self._network = network
+        self.idx = idx
+    
+    def unbind(self) -> None:
+        """解除与路网的绑定，保留当前流量"""
+        self._flow = self.flow
+        self._network = None
+        self.idx = -1
     
     def get_free_flow_time(self) -> float:
         """
@@ -51,7 +108,7 @@ class Link:
         Returns:
             自由流行程时间
         """
-        return self.length / self.speed_max
+        return self._t0
     
     def get_travel_time(self, flow: Optional[float] = None) -> float:
         """
@@ -59,6 +116,8 @@ class Link:
         
         t(q) = t0 * (1 + q/cap)^2
         
+        迭代中可能出现的微小负流量按0处理，行程时间不低于自由流时间
+        
         Args:
             flow: 流量，如果为None则使用当前流量
         
@@ -67,10 +126,10 @@ class Link:
         """
         if flow is None:
             flow = self.flow
+        flow = flow if flow > 0.0 else 0.0
         
-        t0 = self.get_free_flow_time()
-        congestion_factor = (1 + flow / self.capacity) ** 2
-        return t0 * congestion_factor
+        congestion = 1.0 + flow * self._inv_cap
+        return self._t0 * congestion * congestion
     
     def update_flow(self, flow: float) -> None:
         """
@@ -88,7 +147,7 @@ class Link:
         Returns:
             路段ID（格式：起点+终点，如'AB'）
         """
-        return f"{self.from_node}{self.to_node}"
+        return self._id
     
     def __repr__(self) -> str:
         """字符串表示"""
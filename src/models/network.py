@@ -1,8 +1,29 @@
 """路网（Network）数据模型"""
+import gc
 import json
 import math
-from typing import Dict, List, Optional, Tuple
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set, Tuple, Union
+import numpy as np
 from .link import Link
+from ._json import load_json_fields
+from ._sidecar import load_sidecar, save_sidecar
+from ._kernels import _add_flows_bpr_total, _bpr_total
+
+# 路段数不少于该值且行程时间未缓存时，总出行时间改用Numba内核单次遍历计算
+BPR_KERNEL_MIN_LINKS = 2048
+
+
+@contextmanager
+def _gc_paused():
+    """批量创建大量对象期间暂停循环垃圾回收，避免分代回收反复扫描新建的路段"""
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gc_enabled:
+            gc.enable()
 
 
 class Network:
@@ -13,6 +34,18 @@ class Network:
         nodes: 节点字典 {节点名: (x坐标, y坐标)}
         links: 路段字典 {路段ID: Link对象}
         adjacency: 邻接表 {节点名: [(邻居节点, 路段ID), ...]}
+        link_index: 路段索引 {路段ID: 数组下标}
+        links_list: 按数组下标排列的路段列表
+        flow_arr: 各路段流量数组（与link_index对齐）
+        cap_arr: 各路段通行能力数组
+        t0_arr: 各路段自由流行程时间数组
+        node_index: 节点索引 {节点名: 整数编号}
+        indptr, indices, link_idx: CSR邻接结构（出边终点编号及对应路段下标）
+        coord_arr: 节点坐标数组 (节点数, 2)，按节点编号排列
+        heuristic_scale: A*启发函数系数，使 scale×直线距离 不超过任何路径的自由流时间
+        weight_version: 路段权重版本号，流量变化时递增
+        topology_version: 拓扑版本号，节点或路段变化时递增
+        current_times: 当前流量下各路段行程时间（按权重版本缓存，只读）
     """
     
     def __init__(self):
@@ -20,72 +53,449 @@ class Network:
         self.nodes: Dict[str, Tuple[float, float]] = {}
         self.links: Dict[str, Link] = {}
         self.adjacency: Dict[str, List[Tuple[str, str]]] = {}
+        
+        # 路段属性的并行数组（SoA），由_sync_arrays()构建
+        self.link_index: Dict[str, int] = {}
+        self.links_list: List[Link] = []
+        self.flow_arr: np.ndarray = np.zeros(0)
+        self.cap_arr: np.ndarray = np.zeros(0)
+        self.t0_arr: np.ndarray = np.zeros(0)
+        
+        # CSR邻接结构，节点u的出边位于 indptr[u]:indptr[u+1]
+        self.node_index: Dict[str, int] = {}
+        self.node_names: List[str] = []
+        self.indptr: np.ndarray = np.zeros(1, dtype=np.int32)
+        self.indices: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.link_idx: np.ndarray = np.zeros(0, dtype=np.int32)
+        
+        # 路段端点索引 {(起点, 终点): 数组下标}，首次调用get_link时构建
+        self._pair_index: Optional[Dict[Tuple[str, str], int]] = None
+        
+        # A*所需的节点坐标与启发函数系数
+        self.coord_arr: np.ndarray = np.zeros((0, 2))
+        self.heuristic_scale: float = 0.0
+        
+        # 拓扑版本号，节点或路段增删时递增（流量变化不影响）
+        self.topology_version: int = 0
+        # 按路段ID排序的数组下标缓存 (拓扑版本, 下标数组)
+        self._sorted_order: Optional[Tuple[int, np.ndarray]] = None
+        # 绘图用NetworkX图缓存 (拓扑版本, 图, 节点位置, 边列表)，由visualization模块维护
+        self._nx_graph: Optional[tuple] = None
+        
+        self._synced_links: Optional[Dict[str, Link]] = None
+        self._synced_nodes: Optional[Dict[str, Tuple[float, float]]] = None
+        
+        # 最短路径缓存 {(起点, 终点, 权重版本): (路径, 总时间)}
+        self.weight_version: int = 0
+        self._path_cache: Dict[Tuple[str, str, int], Tuple[Optional[List[str]], float]] = {}
+        self._current_times: np.ndarray = np.zeros(0)
+        self._times_version: int = -1
+        
+        # 最短路树缓存 {(起点编号, 权重版本): (距离数组, 前驱节点数组, 前驱路段数组)}
+        self._tree_cache: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        # 当前权重版本下已做过单对查询的起点编号
+        self._queried_origins: Set[int] = set()
     
-    def load_from_json(self, filepath: str) -> None:
+    def load_from_json(self, filepath: str, use_cache: bool = False) -> None:
         """
         从JSON文件加载路网数据
         
         Args:
             filepath: JSON文件路径
+            use_cache: 是否使用pickle旁路缓存（filepath.pkl）。仅对空路网生效：
+                缓存有效时直接恢复，否则正常解析后写入缓存。缓存以pickle读取，
+                只应对可信的数据目录开启
         
         Raises:
             FileNotFoundError: 文件不存在
             ValueError: 数据格式错误
         """
+        # 向已有路网追加数据时不读写缓存，避免缓存中混入其他来源的节点和路段
+        use_cache = use_cache and not self.nodes and not self.links
+        if use_cache:
+            cached = load_sidecar(filepath)
+            if isinstance(cached, dict):
+                self._restore(cached)
+                return
+        
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_json_fields(filepath, {
+                'nodes': ['name', 'x', 'y'],
+                'links': ['between', 'capacity', 'speedmax']
+            })
         except FileNotFoundError as e:
             raise FileNotFoundError(f"Network file not found: {filepath}") from e
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON format: {filepath}") from e
         
+        # 字段与目标字典在循环外各取一次，循环内不再重复查找
+        nodes = self.nodes
+        adjacency = self.adjacency
+        
         # 加载节点
         try:
-            node_names = data['nodes']['name']
-            node_x = data['nodes']['x']
-            node_y = data['nodes']['y']
+            node_data = data['nodes']
+            node_names, node_x, node_y = node_data['name'], node_data['x'], node_data['y']
             
             for name, x, y in zip(node_names, node_x, node_y):
-                self.nodes[name] = (x, y)
-                self.adjacency[name] = []
+                nodes[name] = (x, y)
+                adjacency[name] = []
         except KeyError as e:
             raise ValueError(f"Missing required field in network data: {e}") from e
         
         # 加载路段
         try:
-            link_betweens = data['links']['between']
-            link_capacities = data['links']['capacity']
-            link_speedmax = data['links']['speedmax']
+            link_data = data['links']
+            link_betweens, link_capacities, link_speedmax = (
+                link_data['between'], link_data['capacity'], link_data['speedmax']
+            )
+        except KeyError as e:
+            raise ValueError(f"Missing required field in link data: {e}") from e
+        
+        for between in link_betweens:
+            if len(between) < 2:
+                raise ValueError(f"Invalid link format: {between}")
+        from_nodes = [between[0] for between in link_betweens]
+        to_nodes = [between[1] for between in link_betweens]
+        
+        # 端点在全部已加载节点中查找（路段可引用先前文件中加载的节点），
+        # 得到的编号数组同时用于计算长度和构建CSR，不再逐路段重复查找
+        had_links = bool(self.links)
+        self._sync_nodes()
+        try:
+            from_idx, to_idx = self._resolve_endpoints(from_nodes, to_nodes)
+        except KeyError as e:
+            raise ValueError(f"Invalid link endpoint: {e.args[0]}") from e
+        coords = self.coord_arr
+        lengths = np.hypot(*(coords[to_idx] - coords[from_idx]).T).tolist()
+        
+        with _gc_paused():
+            self._add_links(from_nodes, to_nodes, lengths, link_capacities, link_speedmax)
             
-            for between, capacity, speed_max in zip(link_betweens, link_capacities, link_speedmax):
-                if len(between) < 2:
-                    raise ValueError(f"Invalid link format: {between}")
-                
-                from_node = between[0]
-                to_node = between[1]
-                
-                # 计算路段长度
-                length = self._calculate_distance(from_node, to_node)
-                
-                # 创建路段对象
-                link = Link(
-                    from_node=from_node,
-                    to_node=to_node,
-                    length=length,
-                    capacity=capacity,
-                    speed_max=speed_max,
-                    flow=0
-                )
-                
-                link_id = link.get_id()
-                self.links[link_id] = link
-                
-                # 更新邻接表
-                self.adjacency[from_node].append((to_node, link_id))
+            # 加载前没有路段且文件中没有重复路段时，links的顺序与编号数组一致，可直接复用
+            if not had_links and len(self.links) == len(link_betweens):
+                self._sync_arrays(endpoints=(from_idx, to_idx))
+            else:
+                self._sync_arrays()
+        
+        if use_cache:
+            save_sidecar(filepath, self._snapshot())
+    
+    def _add_links(
+        self,
+        from_nodes: List[str],
+        to_nodes: List[str],
+        lengths: List[float],
+        capacities: List[int],
+        speeds: List[int]
+    ) -> None:
+        """
+        批量创建路段，加入links字典和邻接表（不重建数组结构）
+        
+        Args:
+            from_nodes: 各路段起点名称
+            to_nodes: 各路段终点名称
+            lengths: 各路段长度
+            capacities: 各路段通行能力
+            speeds: 各路段限速
+        """
+        links = self.links
+        adjacency = self.adjacency
+        for from_node, to_node, length, capacity, speed_max in zip(
+            from_nodes, to_nodes, lengths, capacities, speeds
+        ):
+            link = Link(from_node, to_node, length, capacity, speed_max)
+            link_id = link.get_id()
+            links[link_id] = link
+            adjacency[from_node].append((to_node, link_id))
+    
+    def _snapshot(self) -> dict:
+        """
+        导出写入旁路缓存的列式状态
+        
+        只保存节点名称与坐标、路段端点编号及通行能力和限速，路段长度、数组和CSR
+        结构在恢复时重新计算，缓存体积与原始JSON相当
+        
+        Returns:
+            列式状态字典
+        """
+        links_list = self.links_list
+        from_idx, to_idx = self._resolve_endpoints(
+            [link.from_node for link in links_list],
+            [link.to_node for link in links_list]
+        )
+        return {
+            'node_names': self.node_names,
+            'node_x': [x for x, _ in self.nodes.values()],
+            'node_y': [y for _, y in self.nodes.values()],
+            'from_idx': from_idx,
+            'to_idx': to_idx,
+            'capacity': [link.capacity for link in links_list],
+            'speed_max': [link.speed_max for link in links_list],
+        }
+    
+    def _restore(self, cached: dict) -> None:
+        """
+        从旁路缓存的列式状态重建路网
+        
+        Args:
+            cached: _snapshot()导出的列式状态字典
+        """
+        names = cached['node_names']
+        self.nodes.update(zip(names, zip(cached['node_x'], cached['node_y'])))
+        self.adjacency.update((name, []) for name in names)
+        self._sync_nodes()
+        
+        from_idx, to_idx = cached['from_idx'], cached['to_idx']
+        coords = self.coord_arr
+        lengths = np.hypot(*(coords[to_idx] - coords[from_idx]).T).tolist()
+        from_nodes = [names[i] for i in from_idx.tolist()]
+        to_nodes = [names[i] for i in to_idx.tolist()]
+        
+        with _gc_paused():
+            self._add_links(from_nodes, to_nodes, lengths, cached['capacity'], cached['speed_max'])
+            self._sync_arrays(endpoints=(from_idx, to_idx))
+    
+    def _sync_nodes(self) -> None:
+        """根据nodes字典重建节点编号索引与坐标数组"""
+        self.node_names = list(self.nodes)
+        self.node_index = {name: i for i, name in enumerate(self.node_names)}
+        self.coord_arr = np.array(list(self.nodes.values()), dtype=np.float64).reshape(-1, 2)
+    
+    def _resolve_endpoints(
+        self,
+        from_nodes: List[str],
+        to_nodes: List[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        将路段端点名称转换为节点编号数组
+        
+        Args:
+            from_nodes: 各路段起点名称
+            to_nodes: 各路段终点名称
+        
+        Returns:
+            (起点编号数组, 终点编号数组)
         
+        Raises:
+            KeyError: 路段端点不在节点字典中
+        """
+        node_index = self.node_index
+        try:
+            from_idx = np.fromiter(
+                (node_index[name] for name in from_nodes), dtype=np.int32, count=len(from_nodes)
+            )
+            to_idx = np.fromiter(
+                (node_index[name] for name in to_nodes), dtype=np.int32, count=len(to_nodes)
+            )
         except KeyError as e:
-            raise ValueError(f"Missing required field in link data: {e}") from e
+            raise KeyError(f"Node not found: {e.args[0]}") from None
+        return from_idx, to_idx
+    
+    def _sync_arrays(self, endpoints: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> None:
+        """
+        根据links字典重建路段属性数组，并将各路段绑定到数组下标
+        
+        之后路段的flow属性直接读写flow_arr中对应元素
+        
+        Args:
+            endpoints: 按links顺序排列的(起点编号数组, 终点编号数组)。调用方刚执行过
+                _sync_nodes()并已解析出端点时传入，避免重复查找；默认重新解析
+        
+        Raises:
+            KeyError: 路段端点不在节点字典中
+        """
+        if endpoints is None:
+            self._sync_nodes()
+        
+        # 旧数组即将被替换，先将原有路段的流量取回并解除绑定
+        for link in self.links_list:
+            link.unbind()
+        
+        n = len(self.links)
+        self.link_index = {link_id: idx for idx, link_id in enumerate(self.links)}
+        self.links_list = list(self.links.values())
+        
+        # 自由流时间直接取路段构造时算好的t0，不再经由长度重新计算
+        self.flow_arr = np.fromiter((link.flow for link in self.links_list), dtype=np.float64, count=n)
+        self.cap_arr = np.fromiter((link.capacity for link in self.links_list), dtype=np.float64, count=n)
+        self.t0_arr = np.fromiter((link.get_free_flow_time() for link in self.links_list), dtype=np.float64, count=n)
+        
+        for idx, link in enumerate(self.links_list):
+            link.bind(self, idx)
+        
+        self._pair_index = None
+        
+        if endpoints is None:
+            endpoints = self._resolve_endpoints(
+                [link.from_node for link in self.links_list],
+                [link.to_node for link in self.links_list]
+            )
+        from_idx, to_idx = endpoints
+        self._build_csr(from_idx, to_idx)
+        self._build_heuristic(from_idx, to_idx)
+        
+        self._synced_links = self.links
+        self._synced_nodes = self.nodes
+        self.topology_version += 1
+        self.bump_weight_version()
+    
+    def bump_weight_version(self) -> None:
+        """路段权重发生变化，使最短路径及最短路树缓存失效"""
+        self.weight_version += 1
+        self._path_cache.clear()
+        self._tree_cache.clear()
+        self._queried_origins.clear()
+    
+    def get_cached_path(
+        self,
+        origin: str,
+        destination: str
+    ) -> Optional[Tuple[Optional[List[str]], float]]:
+        """
+        查询当前权重版本下缓存的最短路径
+        
+        Args:
+            origin: 起点节点
+            destination: 终点节点
+        
+        Returns:
+            (路径节点列表, 总时间)，未命中时返回None
+        """
+        return self._path_cache.get((origin, destination, self.weight_version))
+    
+    def cache_path(
+        self,
+        origin: str,
+        destination: str,
+        path: Optional[List[str]],
+        cost: float
+    ) -> None:
+        """
+        缓存当前权重版本下的最短路径
+        
+        Args:
+            origin: 起点节点
+            destination: 终点节点
+            path: 路径节点列表
+            cost: 总时间
+        """
+        self._path_cache[(origin, destination, self.weight_version)] = (path, cost)
+    
+    def get_cached_tree(
+        self,
+        origin_idx: int
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        查询当前权重版本下缓存的最短路树
+        
+        Args:
+            origin_idx: 起点节点编号
+        
+        Returns:
+            (距离数组, 前驱节点数组, 前驱路段数组)，未缓存时返回None
+        """
+        return self._tree_cache.get((origin_idx, self.weight_version))
+    
+    def cache_tree(
+        self,
+        origin_idx: int,
+        tree: Tuple[np.ndarray, np.ndarray, np.ndarray]
+    ) -> None:
+        """
+        缓存当前权重版本下的最短路树
+        
+        Args:
+            origin_idx: 起点节点编号
+            tree: (距离数组, 前驱节点数组, 前驱路段数组)
+        """
+        self._tree_cache[(origin_idx, self.weight_version)] = tree
+    
+    def mark_origin_queried(self, origin_idx: int) -> bool:
+        """
+        记录起点在当前权重版本下被单对查询
+        
+        Args:
+            origin_idx: 起点节点编号
+        
+        Returns:
+            该起点在当前权重版本下此前是否已被查询过
+        """
+        if origin_idx in self._queried_origins:
+            return True
+        self._queried_origins.add(origin_idx)
+        return False
+    
+    def _build_csr(self, from_idx: np.ndarray, to_idx: np.ndarray) -> None:
+        """
+        按起点节点对路段分桶，构建CSR邻接结构
+        
+        Args:
+            from_idx: 各路段起点编号（按路段下标排列）
+            to_idx: 各路段终点编号
+        """
+        n_nodes = len(self.node_names)
+        
+        # 稳定排序保持每个节点出边的原始顺序
+        order = np.argsort(from_idx, kind='stable')
+        counts = np.bincount(from_idx, minlength=n_nodes)
+        
+        self.indptr = np.zeros(n_nodes + 1, dtype=np.int32)
+        np.cumsum(counts, out=self.indptr[1:])
+        self.indices = to_idx[order]
+        self.link_idx = order.astype(np.int32)
+    
+    def _build_heuristic(self, from_idx: np.ndarray, to_idx: np.ndarray) -> None:
+        """
+        计算A*启发函数系数
+        
+        取各路段 自由流时间/端点直线距离 的最小值，则对任意节点u, v有
+        scale × dist(u, v) ≤ u到v的最短自由流时间 ≤ 实际行程时间，启发函数一致
+        
+        Args:
+            from_idx: 各路段起点编号（按路段下标排列）
+            to_idx: 各路段终点编号
+        """
+        if not self.links_list:
+            self.heuristic_scale = 0.0
+            return
+        
+        from_xy = self.coord_arr[from_idx]
+        to_xy = self.coord_arr[to_idx]
+        euclid = np.hypot(to_xy[:, 0] - from_xy[:, 0], to_xy[:, 1] - from_xy[:, 1])
+        
+        positive = euclid > 0
+        if not positive.any():
+            self.heuristic_scale = 0.0
+            return
+        self.heuristic_scale = float(np.min(self.t0_arr[positive] / euclid[positive]))
+    
+    def ensure_arrays(self) -> None:
+        """如果links或nodes字典被替换或增删，重建数组结构"""
+        if (self._synced_links is not self.links
+                or self._synced_nodes is not self.nodes
+                or len(self.link_index) != len(self.links)
+                or len(self.node_index) != len(self.nodes)):
+            self._sync_arrays()
+    
+    def flows_to_array(self, flows: Union[Dict[str, float], np.ndarray]) -> np.ndarray:
+        """
+        将流量字典转换为与link_index对齐的数组
+        
+        Args:
+            flows: 流量字典 {link_id: flow}，或已对齐的流量数组
+        
+        Returns:
+            流量数组
+        """
+        self.ensure_arrays()
+        if isinstance(flows, np.ndarray):
+            return flows
+        return np.fromiter(
+            (flows.get(link_id, 0.0) for link_id in self.link_index),
+            dtype=np.float64,
+            count=len(self.link_index)
+        )
     
     def _calculate_distance(self, from_node: str, to_node: str) -> float:
         """
@@ -109,9 +519,85 @@ class Network:
         x1, y1 = self.nodes[from_node]
         x2, y2 = self.nodes[to_node]
         
-        distance = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+        distance = math.hypot(x2 - x1, y2 - y1)
         return distance
     
+    def compute_bpr_times(self) -> np.ndarray:
+        """
+        基于当前流量计算各路段行程时间（BPR函数），按路段下标对齐
+        
+        t = t0 * (1 + flow/cap)^2，负流量按0处理
+        
+        Returns:
+            行程时间数组
+        """
+        self.ensure_arrays()
+        ratio = np.maximum(self.flow_arr, 0.0)
+        ratio /= self.cap_arr
+        ratio += 1.0
+        return self.t0_arr * ratio * ratio
+    
+    @property
+    def current_times(self) -> np.ndarray:
+        """
+        当前流量下各路段行程时间
+        
+        结果按weight_version缓存，流量未变化时重复访问不会重新计算。
+        返回的数组为只读，需要修改时请先复制
+        
+        Returns:
+            行程时间数组
+        """
+        self.ensure_arrays()
+        if self._times_version != self.weight_version:
+            self._current_times = self.compute_bpr_times()
+            self._current_times.setflags(write=False)
+            self._times_version = self.weight_version
+        return self._current_times
+    
+    @property
+    def sorted_link_order(self) -> np.ndarray:
+        """
+        按路段ID排序后的数组下标
+        
+        结果按拓扑版本缓存，路段不变时无需重复排序
+        
+        Returns:
+            下标数组，link_ids[sorted_link_order]为有序路段ID
+        """
+        self.ensure_arrays()
+        if self._sorted_order is None or self._sorted_order[0] != self.topology_version:
+            order = np.array(
+                [self.link_index[link_id] for link_id in sorted(self.link_index)],
+                dtype=np.intp
+            )
+            self._sorted_order = (self.topology_version, order)
+        return self._sorted_order[1]
+    
+    def array_to_flows(self, flow_arr: np.ndarray) -> Dict[str, float]:
+        """
+        将与link_index对齐的流量数组转换为流量字典
+        
+        Args:
+            flow_arr: 流量数组
+        
+        Returns:
+            流量字典 {link_id: flow}
+        """
+        self.ensure_arrays()
+        return dict(zip(self.link_index, flow_arr.tolist()))
+    
+    def set_flows(self, flows: Union[Dict[str, float], np.ndarray]) -> None:
+        """
+        批量设置所有路段流量
+        
+        Args:
+            flows: 流量字典 {link_id: flow}，或与link_index对齐的数组
+        """
+        flow_arr = self.flows_to_array(flows)
+        self.flow_arr[:] = flow_arr
+        self.bump_weight_version()
+    
     def get_link(self, from_node: str, to_node: str) -> Optional[Link]:
         """
         获取指定的路段
@@ -123,22 +609,57 @@ class Network:
         Returns:
             Link对象，如果不存在则返回None
         """
-        link_id = f"{from_node}{to_node}"
-        return self.links.get(link_id)
+        # 按端点元组查找，避免拼接字符串ID（多字符节点名拼接后可能产生歧义）
+        self.ensure_arrays()
+        if self._pair_index is None:
+            self._pair_index = {
+                (link.from_node, link.to_node): idx for idx, link in enumerate(self.links_list)
+            }
+        idx = self._pair_index.get((from_node, to_node))
+        return self.links_list[idx] if idx is not None else None
     
     def get_all_links(self) -> List[Link]:
         """
         获取所有路段
         
         Returns:
-            Link对象列表
+            Link对象列表（顺序与路段属性数组一致）
         """
-        return list(self.links.values())
+        self.ensure_arrays()
+        return list(self.links_list)
     
     def reset_flows(self) -> None:
         """重置所有路段的流量为0"""
-        for link in self.links.values():
-            link.update_flow(0)
+        self.ensure_arrays()
+        # 原地清零，Link.flow 直接读取该数组，无需逐个路段赋值
+        self.flow_arr.fill(0.0)
+        self.bump_weight_version()
+    
+    def update_flows_and_total_time(self, delta: Union[Dict[str, float], np.ndarray]) -> float:
+        """
+        将流量增量累加到各路段，并返回累加后的路网总出行时间
+        
+        累加与总出行时间在同一次遍历中完成，等价于先set_flows(flow_arr + delta)
+        再调用get_total_travel_time()，但只读写流量数组一次
+        
+        Args:
+            delta: 流量增量字典 {link_id: flow}，或与link_index对齐的数组
+        
+        Returns:
+            总出行时间
+        
+        Raises:
+            ValueError: 增量数组长度与路段数不一致
+        """
+        delta_arr = np.ascontiguousarray(self.flows_to_array(delta), dtype=np.float64)
+        # Numba内核不做越界检查，长度不符时必须提前拒绝
+        if delta_arr.shape != self.flow_arr.shape:
+            raise ValueError(
+                f"Flow delta shape {delta_arr.shape} does not match link count {self.flow_arr.shape}"
+            )
+        total = _add_flows_bpr_total(self.flow_arr, delta_arr, self.t0_arr, self.cap_arr)
+        self.bump_weight_version()
+        return float(total)
     
     def get_total_travel_time(self) -> float:
         """
@@ -149,12 +670,24 @@ class Network:
         Returns:
             总出行时间
         """
-        total_time = 0.0
-        for link in self.links.values():
-            if link.flow > 0:
-                travel_time = link.get_travel_time()
-                total_time += link.flow * travel_time
-        return total_time
+        self.ensure_arrays()
+        
+        # 大规模路网直接融合计算，避免生成掩码和中间数组
+        if self._times_version != self.weight_version and len(self.flow_arr) >= BPR_KERNEL_MIN_LINKS:
+            return float(_bpr_total(self.flow_arr, self.t0_arr, self.cap_arr))
+        
+        # 只计算有流量的路段，零流量路段对总出行时间没有贡献
+        idx = np.flatnonzero(self.flow_arr > 0)
+        if len(idx) == 0:
+            return 0.0
+        
+        flow = self.flow_arr[idx]
+        if self._times_version == self.weight_version:
+            times = self._current_times[idx]
+        else:
+            congestion = 1.0 + flow / self.cap_arr[idx]
+            times = self.t0_arr[idx] * congestion * congestion
+        return float(np.dot(flow, times))
     
     def get_neighbors(self, node: str) -> List[Tuple[str, str]]:
         """
@@ -168,6 +701,20 @@ class Network:
         """
         return self.adjacency.get(node, [])
     
+    def neighbors_iloc(self, node_idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        按节点编号获取出边，直接返回CSR数组切片
+        
+        Args:
+            node_idx: 节点编号（见node_index）
+        
+        Returns:
+            (邻居节点编号数组, 路段下标数组)
+        """
+        self.ensure_arrays()
+        start, end = self.indptr[node_idx], self.indptr[node_idx + 1]
+        return self.indices[start:end], self.link_idx[start:end]
+    
     def __repr__(self) -> str:
         """字符串表示"""
         return f"Network(nodes={len(self.nodes)}, links={len(self.links)})"
@@ -3,6 +3,12 @@ import logging
 import sys
 from typing import Optional
 
+# 所有handler共享同一个格式化器，避免每次配置时重新解析格式串
+_FORMATTER = logging.Formatter(
+    fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
 
 def setup_logger(
     name: str = "traffic_assignment",
@@ -12,6 +18,9 @@ def setup_logger(
     """
     配置并返回日志记录器
     
+    返回的记录器不向根记录器传播，避免重复输出。调用处请使用%风格的
+    延迟格式化，如 logger.debug("gap=%.6f", gap)，级别未开启时不会格式化消息
+    
     Args:
         name: 日志记录器名称
         level: 日志级别 (DEBUG, INFO, WARNING, ERROR)
@@ -23,27 +32,23 @@ def setup_logger(
     logger = logging.getLogger(name)
     logger.setLevel(level)
     
+    logger.propagate = False
+    
     # 避免重复添加handler
     if logger.handlers:
         return logger
     
-    # 创建格式化器
-    formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
     # 控制台handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(_FORMATTER)
     logger.addHandler(console_handler)
     
     # 文件handler (可选)
     if log_file:
         file_handler = logging.FileHandler(log_file, encoding='utf-8')
         file_handler.setLevel(level)
-        file_handler.setFormatter(formatter)
+        file_handler.setFormatter(_FORMATTER)
         logger.addHandler(file_handler)
     
     return logger
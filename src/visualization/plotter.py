@@ -1,13 +1,11 @@
 """可视化工具"""
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+from matplotlib.collections import LineCollection
 from matplotlib import rcParams
 import networkx as nx
-from typing import List, Dict, Optional
-import sys
-import os
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import numpy as np
+from typing import List, Dict, Optional, Tuple, Union
 
 from models.network import Network
 
@@ -15,25 +13,34 @@ from models.network import Network
 rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
 rcParams['axes.unicode_minus'] = False
 
+# 路段数超过该值（且超过max_labeled_edges）时改用LineCollection直接绘制，
+# 不再构建NetworkX图及逐边标签
+LARGE_NETWORK_LINKS = 200
 
-def plot_network(
-    network: Network,
-    title: str = "Road Network",
-    save_path: Optional[str] = None,
-    show: bool = True
-) -> None:
+# 保存图片的分辨率
+SAVE_DPI = 150
+
+
+def _get_nx_graph(
+    network: Network
+) -> Tuple[nx.DiGraph, Dict[str, Tuple[float, float]], List[Tuple[str, str]]]:
     """
-    绘制路网结构图
+    获取路网对应的NetworkX图
+    
+    图缓存在路网对象上，仅在拓扑变化（topology_version改变）时重建，
+    流量变化不会触发重建
     
     Args:
         network: 路网对象
-        title: 图标题
-        save_path: 保存路径（可选）
-        show: 是否显示图形
+    
+    Returns:
+        (NetworkX图, 节点位置字典, 与links_list对齐的边列表)
     """
-    fig, ax = plt.subplots(figsize=(12, 10))
+    network.ensure_arrays()
+    cached = network._nx_graph
+    if cached is not None and cached[0] == network.topology_version:
+        return cached[1:]
     
-    # 创建NetworkX图
     G = nx.DiGraph()
     
     # 添加节点
@@ -41,18 +48,91 @@ def plot_network(
         G.add_node(node, pos=(x, y))
     
     # 添加边
-    for link_id, link in network.links.items():
+    edgelist = []
+    for link in network.links_list:
+        edge = (link.from_node, link.to_node)
         G.add_edge(
-            link.from_node,
-            link.to_node,
+            *edge,
             capacity=link.capacity,
             speed=link.speed_max,
             length=link.length
         )
+        edgelist.append(edge)
     
     # 获取节点位置
     pos = nx.get_node_attributes(G, 'pos')
     
+    network._nx_graph = (network.topology_version, G, pos, edgelist)
+    return G, pos, edgelist
+
+
+def _draw_network_fast(
+    ax,
+    network: Network,
+    edge_colors,
+    edge_widths,
+    node_size: float
+) -> None:
+    """
+    使用LineCollection一次性绘制所有路段，散点绘制节点（适用于大规模路网）
+    
+    Args:
+        ax: 坐标轴
+        network: 路网对象
+        edge_colors: 路段颜色（单一颜色或与links_list对齐的数组）
+        edge_widths: 路段宽度（单一值或与links_list对齐的数组）
+        node_size: 节点大小
+    """
+    network.ensure_arrays()
+    from_idx = np.fromiter(
+        (network.node_index[link.from_node] for link in network.links_list),
+        dtype=np.intp, count=len(network.links_list)
+    )
+    to_idx = np.fromiter(
+        (network.node_index[link.to_node] for link in network.links_list),
+        dtype=np.intp, count=len(network.links_list)
+    )
+    segments = np.stack([network.coord_arr[from_idx], network.coord_arr[to_idx]], axis=1)
+    
+    # 大量图元栅格化输出，避免矢量图元过多导致保存缓慢、文件过大
+    ax.add_collection(LineCollection(
+        segments, colors=edge_colors, linewidths=edge_widths, rasterized=True
+    ))
+    ax.scatter(
+        network.coord_arr[:, 0], network.coord_arr[:, 1],
+        s=node_size, c='lightblue', edgecolors='black', zorder=2, rasterized=True
+    )
+    ax.autoscale_view()
+
+
+def plot_network(
+    network: Network,
+    title: str = "Road Network",
+    save_path: Optional[str] = None,
+    show: bool = True,
+    max_labeled_edges: int = 200
+) -> None:
+    """
+    绘制路网结构图
+    
+    Args:
+        network: 路网对象
+        title: 图标题
+        save_path: 保存路径（可选）
+        show: 是否显示图形
+        max_labeled_edges: 路段数超过该值时不绘制路段标签；大于LARGE_NETWORK_LINKS时，
+            路段数不超过该值的路网也会走NetworkX绘制路径以便绘制标签
+    """
+    fig, ax = plt.subplots(figsize=(12, 10), constrained_layout=True)
+    
+    if len(network.links) > max(LARGE_NETWORK_LINKS, max_labeled_edges):
+        _draw_network_fast(ax, network, 'gray', 1, node_size=20)
+        _finish_plot(ax, title, save_path, show, "路网图")
+        return
+    
+    # 获取（缓存的）NetworkX图
+    G, pos, edgelist = _get_nx_graph(network)
+    
     # 绘制节点
     nx.draw_networkx_nodes(
         G, pos,
@@ -74,6 +154,7 @@ def plot_network(
     # 绘制边
     nx.draw_networkx_edges(
         G, pos,
+        edgelist=edgelist,
         edge_color='gray',
         width=2,
         arrowsize=20,
@@ -82,33 +163,21 @@ def plot_network(
         ax=ax
     )
     
-    # 添加边的标签（cap和spd）
-    edge_labels = {}
-    for link_id, link in network.links.items():
-        edge_labels[(link.from_node, link.to_node)] = (
-            f"cap={link.capacity}, spd={link.speed_max}"
+    # 添加边的标签（cap和spd），路段过多时标签无法辨认，直接跳过
+    if len(edgelist) <= max_labeled_edges:
+        edge_labels = dict(zip(edgelist, (
+            f"cap={link.capacity}, spd={link.speed_max}" for link in network.links_list
+        )))
+        
+        nx.draw_networkx_edge_labels(
+            G, pos,
+            edge_labels=edge_labels,
+            font_size=9,
+            bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.8),
+            ax=ax
         )
     
-    nx.draw_networkx_edge_labels(
-        G, pos,
-        edge_labels=edge_labels,
-        font_size=9,
-        bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.8),
-        ax=ax
-    )
-    
-    ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
-    ax.axis('off')
-    plt.tight_layout()
-    
-    if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"路网图已保存到: {save_path}")
-    
-    if show:
-        plt.show()
-    else:
-        plt.close()
+    _finish_plot(ax, title, save_path, show, "路网图")
 
 
 def plot_flow_assignment(
@@ -116,7 +185,8 @@ def plot_flow_assignment(
     title: str = "Traffic Assignment Result",
     save_path: Optional[str] = None,
     show: bool = True,
-    highlight_congested: bool = True
+    highlight_congested: bool = True,
+    max_labeled_edges: int = 200
 ) -> None:
     """
     绘制流量分配结果
@@ -127,42 +197,37 @@ def plot_flow_assignment(
         save_path: 保存路径（可选）
         show: 是否显示图形
         highlight_congested: 是否高亮拥堵路段
+        max_labeled_edges: 路段数超过该值时不绘制流量标签；大于LARGE_NETWORK_LINKS时，
+            路段数不超过该值的路网也会走NetworkX绘制路径以便绘制标签
     """
-    fig, ax = plt.subplots(figsize=(14, 12))
+    fig, ax = plt.subplots(figsize=(14, 12), constrained_layout=True)
     
-    # 创建NetworkX图
-    G = nx.DiGraph()
+    # 一次性计算各路段流量、流量比、边宽度和颜色（与links_list对齐）
+    network.ensure_arrays()
+    flows = network.flow_arr
+    ratios = flows / network.cap_arr
+    max_flow = flows.max() if len(flows) else 1
     
-    # 添加节点
-    for node, (x, y) in network.nodes.items():
-        G.add_node(node, pos=(x, y))
+    # 边宽度根据流量大小
+    if max_flow > 0:
+        edge_widths = 1 + (flows / max_flow) * 5
+    else:
+        edge_widths = np.ones(len(flows))
     
-    # 计算流量范围用于归一化
-    max_flow = max([link.flow for link in network.links.values()]) if network.links else 1
+    # 边颜色根据拥堵程度 (flow/capacity)
+    edge_colors = np.where(ratios < 0.5, 'green', np.where(ratios < 0.8, 'orange', 'red'))
     
-    # 添加边和流量信息
-    edge_colors = []
-    edge_widths = []
+    if len(flows) > max(LARGE_NETWORK_LINKS, max_labeled_edges):
+        _draw_network_fast(ax, network, edge_colors, edge_widths, node_size=20)
+        if highlight_congested:
+            _add_congestion_legend(ax)
+        _finish_plot(ax, title, save_path, show, "流量分配图")
+        return
     
-    for link_id, link in network.links.items():
-        G.add_edge(link.from_node, link.to_node, flow=link.flow)
-        
-        # 边宽度根据流量大小
-        width = 1 + (link.flow / max_flow) * 5 if max_flow > 0 else 1
-        edge_widths.append(width)
-        
-        # 边颜色根据拥堵程度 (flow/capacity)
-        ratio = link.flow / link.capacity if link.capacity > 0 else 0
-        if ratio < 0.5:
-            color = 'green'
-        elif ratio < 0.8:
-            color = 'orange'
-        else:
-            color = 'red'
-        edge_colors.append(color)
-    
-    # 获取节点位置
-    pos = nx.get_node_attributes(G, 'pos')
+    # 获取（缓存的）NetworkX图，只刷新各边流量属性
+    G, pos, edgelist = _get_nx_graph(network)
+    for edge, flow in zip(edgelist, flows.tolist()):
+        G.edges[edge]['flow'] = flow
     
     # 绘制节点
     nx.draw_networkx_nodes(
@@ -185,44 +250,59 @@ def plot_flow_assignment(
     # 绘制边
     nx.draw_networkx_edges(
         G, pos,
-        edge_color=edge_colors,
-        width=edge_widths,
+        edgelist=edgelist,
+        edge_color=list(edge_colors),
+        width=list(edge_widths),
         arrowsize=20,
         arrowstyle='->',
         connectionstyle='arc3,rad=0.1',
         ax=ax
     )
     
-    # 添加边的流量标签
-    edge_labels = {}
-    for link_id, link in network.links.items():
-        ratio = link.flow / link.capacity if link.capacity > 0 else 0
-        edge_labels[(link.from_node, link.to_node)] = (
-            f"flow={link.flow:.0f}\nratio={ratio:.2f}"
+    # 添加边的流量标签（整体格式化），路段过多时跳过
+    if len(edgelist) <= max_labeled_edges:
+        labels = np.char.add(np.char.mod('flow=%.0f\n', flows), np.char.mod('ratio=%.2f', ratios))
+        
+        nx.draw_networkx_edge_labels(
+            G, pos,
+            edge_labels=dict(zip(edgelist, labels.tolist())),
+            font_size=8,
+            bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.9),
+            ax=ax
         )
     
-    nx.draw_networkx_edge_labels(
-        G, pos,
-        edge_labels=edge_labels,
-        font_size=8,
-        bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.9),
-        ax=ax
-    )
-    
     # 添加图例
     if highlight_congested:
-        green_patch = mpatches.Patch(color='green', label='畅通 (ratio<0.5)')
-        orange_patch = mpatches.Patch(color='orange', label='拥挤 (0.5≤ratio<0.8)')
-        red_patch = mpatches.Patch(color='red', label='拥堵 (ratio≥0.8)')
-        ax.legend(handles=[green_patch, orange_patch, red_patch], loc='upper right')
+        _add_congestion_legend(ax)
     
+    _finish_plot(ax, title, save_path, show, "流量分配图")
+
+
+def _add_congestion_legend(ax) -> None:
+    """添加拥堵程度图例"""
+    green_patch = mpatches.Patch(color='green', label='畅通 (ratio<0.5)')
+    orange_patch = mpatches.Patch(color='orange', label='拥挤 (0.5≤ratio<0.8)')
+    red_patch = mpatches.Patch(color='red', label='拥堵 (ratio≥0.8)')
+    ax.legend(handles=[green_patch, orange_patch, red_patch], loc='upper right')
+
+
+def _finish_plot(ax, title: str, save_path: Optional[str], show: bool, name: str) -> None:
+    """
+    设置路网图标题并保存/显示
+    
+    Args:
+        ax: 坐标轴
+        title: 图标题
+        save_path: 保存路径（可选）
+        show: 是否显示图形
+        name: 保存提示中的图名称
+    """
     ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
     ax.axis('off')
-    plt.tight_layout()
     
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"流量分配图已保存到: {save_path}")
+        plt.savefig(save_path, dpi=SAVE_DPI, bbox_inches='tight')
+        print(f"{name}已保存到: {save_path}")
     
     if show:
         plt.show()
@@ -249,7 +329,7 @@ def plot_convergence(
         print("警告: 没有收敛历史记录")
         return
     
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5), constrained_layout=True)
     
     iterations = [h['iteration'] for h in history]
     gaps = [h['relative_gap'] for h in history]
@@ -271,10 +351,9 @@ def plot_convergence(
     ax2.grid(True, alpha=0.3)
     
     fig.suptitle(title, fontsize=16, fontweight='bold')
-    plt.tight_layout()
     
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        plt.savefig(save_path, dpi=SAVE_DPI, bbox_inches='tight')
         print(f"收敛图已保存到: {save_path}")
     
     if show:
@@ -298,7 +377,7 @@ def plot_comparison(
         save_path: 保存路径（可选）
         show: 是否显示图形
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = plt.subplots(figsize=(10, 6), constrained_layout=True)
     
     algorithms = list(results.keys())
     times = list(results.values())
@@ -341,10 +420,8 @@ def plot_comparison(
     ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
     ax.grid(True, axis='y', alpha=0.3)
     
-    plt.tight_layout()
-    
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        plt.savefig(save_path, dpi=SAVE_DPI, bbox_inches='tight')
         print(f"比较图已保存到: {save_path}")
     
     if show:
@@ -354,8 +431,9 @@ def plot_comparison(
 
 
 def plot_flow_difference(
-    network1: Network,
-    network2: Network,
+    network: Network,
+    flows_a: Union[Dict[str, float], np.ndarray],
+    flows_b: Union[Dict[str, float], np.ndarray],
     label1: str = "算法1",
     label2: str = "算法2",
     title: str = "流量差异对比",
@@ -365,26 +443,26 @@ def plot_flow_difference(
     """
     绘制两种算法的流量差异对比图
     
+    两组流量共用同一路网拓扑，无需为每种算法单独构建路网对象。
+    
     Args:
-        network1: 第一个路网（含流量）
-        network2: 第二个路网（含流量）
+        network: 路网对象（提供路段拓扑）
+        flows_a: 算法1的流量，字典 {link_id: flow} 或与link_index对齐的数组
+        flows_b: 算法2的流量，格式同flows_a
         label1: 算法1名称
         label2: 算法2名称
         title: 图标题
         save_path: 保存路径
         show: 是否显示
     """
-    fig, ax = plt.subplots(figsize=(14, 8))
+    fig, ax = plt.subplots(figsize=(14, 8), constrained_layout=True)
     
-    # 收集数据
-    link_ids = []
-    flows1 = []
-    flows2 = []
-    
-    for link_id in sorted(network1.links.keys()):
-        link_ids.append(link_id)
-        flows1.append(network1.links[link_id].flow)
-        flows2.append(network2.links[link_id].flow)
+    # 收集数据（按路段ID排序）
+    order = network.sorted_link_order
+    all_ids = list(network.link_index)
+    link_ids = [all_ids[i] for i in order]
+    flows1 = np.take(network.flows_to_array(flows_a), order)
+    flows2 = np.take(network.flows_to_array(flows_b), order)
     
     x = range(len(link_ids))
     width = 0.35
@@ -412,10 +490,8 @@ def plot_flow_difference(
     ax.legend(fontsize=12)
     ax.grid(True, axis='y', alpha=0.3)
     
-    plt.tight_layout()
-    
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        plt.savefig(save_path, dpi=SAVE_DPI, bbox_inches='tight')
         print(f"流量差异图已保存到: {save_path}")
     
     if show:
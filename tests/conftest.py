@@ -0,0 +1,46 @@
+"""测试公共夹具"""
+import copy
+import os
+import sys
+
+import pytest
+
+# 添加src目录到路径（测试模块不再各自插入，整个会话只插入一次）
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from models.network import Network
+from models.demand import Demand
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+
+@pytest.fixture(scope="session")
+def base_network():
+    """整个测试会话只加载一次的真实路网（不要直接修改）"""
+    network = Network()
+    network.load_from_json(os.path.join(DATA_DIR, 'network.json'))
+    return network
+
+
+@pytest.fixture(scope="session")
+def base_demand():
+    """整个测试会话只加载一次的真实需求（不要直接修改）"""
+    demand = Demand()
+    demand.load_from_json(os.path.join(DATA_DIR, 'demand.json'))
+    return demand
+
+
+@pytest.fixture
+def test_network(base_network):
+    """真实路网的独立副本，流量为0"""
+    network = copy.deepcopy(base_network)
+    network.reset_flows()
+    return network
+
+
+@pytest.fixture
+def test_demand(base_demand):
+    """真实需求的独立副本"""
+    return copy.deepcopy(base_demand)
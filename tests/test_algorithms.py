@@ -1,17 +1,41 @@
 """测试交通分配算法"""
-import pytest
-import os
-import sys
+import math
 
-# 添加src目录到路径
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import networkx as nx
+import numpy as np
+import pytest
 
+from models.link import Link
 from models.network import Network
 from models.demand import Demand
-from algorithms.dijkstra import shortest_path, get_path_links
+from algorithms.dijkstra import shortest_path, shortest_path_tree, dijkstra_sssp, get_path_links
 from algorithms.all_or_nothing import all_or_nothing_assignment
 from algorithms.incremental import incremental_assignment
-from algorithms.frank_wolfe import frank_wolfe_assignment
+from algorithms.frank_wolfe import frank_wolfe_assignment, line_search, calculate_objective
+
+
+def build_network(coords, edges):
+    """
+    按节点坐标和有向边构建路网，路段长度取端点直线距离
+    
+    Args:
+        coords: 节点坐标列表，第i个节点命名为 'N%02d' % i
+        edges: 有向边列表 [(起点编号, 终点编号, 限速, 通行能力), ...]
+    
+    Returns:
+        路网对象
+    """
+    # 节点名等长，拼接得到的路段ID不会重复
+    names = ['N%02d' % i for i in range(len(coords))]
+    network = Network()
+    network.nodes = {name: (float(x), float(y)) for name, (x, y) in zip(names, coords)}
+    network.adjacency = {name: [] for name in names}
+    for u, v, speed, capacity in edges:
+        (x1, y1), (x2, y2) = coords[u], coords[v]
+        link = Link(names[u], names[v], math.hypot(x2 - x1, y2 - y1), capacity, speed, 0)
+        network.links[link.get_id()] = link
+        network.adjacency[names[u]].append((names[v], link.get_id()))
+    return network
 
 
 class TestDijkstra:
@@ -63,6 +87,143 @@ class TestDijkstra:
         assert path is None
         assert cost == float('inf')
     
+    def test_shortest_path_tree(self, simple_network):
+        """测试一对多最短路树与单对最短路一致"""
+        dist, prev_node, prev_link = shortest_path_tree(simple_network, 'A')
+        _, cost = shortest_path(simple_network, 'A', 'C')
+        
+        c = simple_network.node_index['C']
+        assert abs(dist[c] - cost) < 1e-9
+        assert prev_node[c] == simple_network.node_index['B']
+        assert prev_link[simple_network.node_index['A']] == -1
+    
+    def test_dijkstra_sssp(self, simple_network):
+        """测试按节点编号计算单源最短路树"""
+        simple_network.ensure_arrays()
+        src = simple_network.node_index['A']
+        dist, prev_node, prev_link = dijkstra_sssp(simple_network, src)
+        
+        assert dist[src] == 0.0
+        assert prev_link[src] == -1
+        for node in ('B', 'C'):
+            _, cost = shortest_path(simple_network, 'A', node)
+            assert abs(dist[simple_network.node_index[node]] - cost) < 1e-12
+        
+        for bad_idx in (-1, len(simple_network.node_names)):
+            with pytest.raises(ValueError):
+                dijkstra_sssp(simple_network, bad_idx)
+    
+    def test_shortest_path_cache_invalidated(self, simple_network):
+        """测试流量更新后最短路径缓存失效"""
+        _, cost_before = shortest_path(simple_network, 'A', 'C')
+        assert shortest_path(simple_network, 'A', 'C')[1] == cost_before
+        
+        simple_network.links['AB'].update_flow(1800)
+        _, cost_after = shortest_path(simple_network, 'A', 'C')
+        assert cost_after > cost_before
+    
+    def test_shortest_path_reuses_origin_tree(self, simple_network):
+        """测试同一起点多次查询时改用并缓存整棵最短路树"""
+        path_c, cost_c = shortest_path(simple_network, 'A', 'C')
+        src = simple_network.node_index['A']
+        assert simple_network.get_cached_tree(src) is None
+        
+        path_b, cost_b = shortest_path(simple_network, 'A', 'B')
+        dist, _, _ = simple_network.get_cached_tree(src)
+        assert dist[simple_network.node_index['B']] == cost_b
+        assert dist[simple_network.node_index['C']] == cost_c
+    
+    def test_shortest_path_tree_cached_until_weights_change(self, test_network, test_demand):
+        """测试权重未变化时复用最短路树，流量变化后缓存失效"""
+        flows = all_or_nothing_assignment(test_network, test_demand)
+        # 全有全无分配由并行内核直接计算，不写入最短路树缓存
+        assert not test_network._tree_cache
+        
+        tree = shortest_path_tree(test_network, 'A')
+        assert tree is shortest_path_tree(test_network, 'A')
+        
+        test_network.set_flows(flows)
+        assert shortest_path_tree(test_network, 'A') is not tree
+    
+    def test_dijkstra_sssp_matches_networkx(self):
+        """测试随机路网上索引堆（含降键）的最短路距离与networkx一致"""
+        rng = np.random.default_rng(2024)
+        n = 60
+        coords = rng.uniform(0, 100, size=(n, 2)).tolist()
+        # 环保证连通，另加随机边形成多条可选路线，节点会被多次降键
+        edges = {(i, (i + 1) % n) for i in range(n)}
+        for u in range(n):
+            for v in rng.choice(n, size=4, replace=False):
+                if v != u:
+                    edges.add((u, int(v)))
+        network = build_network(coords, [
+            (u, v, int(rng.choice([30, 45, 60])), int(rng.choice([900, 1800, 3600])))
+            for u, v in sorted(edges)
+        ])
+        network.ensure_arrays()
+        network.set_flows(rng.uniform(0, 2000, size=len(network.links_list)))
+        
+        times = network.current_times
+        graph = nx.DiGraph()
+        for link in network.links_list:
+            graph.add_edge(link.from_node, link.to_node, weight=times[link.idx])
+        
+        for origin in ('N00', 'N17', 'N42'):
+            dist, _, _ = dijkstra_sssp(network, network.node_index[origin])
+            expected = nx.single_source_dijkstra_path_length(graph, origin)
+            assert len(expected) == n
+            for node, cost in expected.items():
+                assert abs(dist[network.node_index[node]] - cost) < 1e-9
+    
+    def test_astar_matches_dijkstra_on_grid(self, monkeypatch):
+        """测试网格路网上A*单对最短路与Dijkstra最短路树距离一致"""
+        import algorithms.dijkstra as dijkstra_module
+        astar_calls = []
+        astar = dijkstra_module._astar_csr
+        monkeypatch.setattr(
+            dijkstra_module, '_astar_csr',
+            lambda *args: astar_calls.append(args[-1]) or astar(*args)
+        )
+        
+        rng = np.random.default_rng(7)
+        side = 6
+        coords = [(10.0 * (i % side), 10.0 * (i // side)) for i in range(side * side)]
+        edges = []
+        for i in range(side * side):
+            row, col = divmod(i, side)
+            neighbors = []
+            if col + 1 < side:
+                neighbors.append(i + 1)
+            if row + 1 < side:
+                neighbors.append(i + side)
+            if col + 1 < side and row + 1 < side and rng.random() < 0.3:
+                neighbors.append(i + side + 1)
+            for j in neighbors:
+                # 限速各异，直线最近的路线不一定最快，启发函数会改变搜索顺序
+                for u, v in ((i, j), (j, i)):
+                    edges.append((u, v, int(rng.choice([20, 40, 80])), 1800))
+        network = build_network(coords, edges)
+        network.ensure_arrays()
+        network.set_flows(rng.uniform(0, 1500, size=len(network.links_list)))
+        times = network.compute_bpr_times()
+        
+        for origin in network.node_names:
+            dist, _, _ = dijkstra_sssp(network, network.node_index[origin], weights=times)
+            for destination in network.node_names:
+                if destination == origin:
+                    continue
+                # 清空查询记录，使每次查询都走A*而不是整棵最短路树
+                network.bump_weight_version()
+                path, cost = shortest_path(network, origin, destination)
+                assert abs(cost - dist[network.node_index[destination]]) < 1e-9
+                path_cost = sum(
+                    link.get_travel_time() for link in get_path_links(network, path)
+                )
+                assert abs(path_cost - cost) < 1e-9
+        
+        n = len(network.node_names)
+        assert len(astar_calls) == n * (n - 1)
+    
     def test_get_path_links(self, simple_network):
         """测试路径转换为路段列表"""
         path = ['A', 'B', 'C']
@@ -75,22 +236,6 @@ class TestDijkstra:
 class TestAllOrNothing:
     """测试全有全无分配"""
     
-    @pytest.fixture
-    def test_network(self):
-        """加载测试网络"""
-        network = Network()
-        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
-        network.load_from_json(os.path.join(data_dir, 'network.json'))
-        return network
-    
-    @pytest.fixture
-    def test_demand(self):
-        """加载测试需求"""
-        demand = Demand()
-        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
-        demand.load_from_json(os.path.join(data_dir, 'demand.json'))
-        return demand
-    
     def test_all_or_nothing_basic(self, test_network, test_demand):
         """测试全有全无分配基本功能"""
         flows = all_or_nothing_assignment(test_network, test_demand)
@@ -112,27 +257,20 @@ class TestAllOrNothing:
         # 这里只检查不超过总需求
         assigned_flow = sum(flows.values())
         assert assigned_flow <= total_demand * len(test_demand.get_od_pairs())
+    
+    def test_all_or_nothing_unknown_node(self, test_network):
+        """测试OD节点不在路网中时跳过该OD对"""
+        demand = Demand()
+        demand.od_pairs = [('A', 'Z', 100), ('A', 'B', 50)]
+        
+        flows = all_or_nothing_assignment(test_network, demand)
+        assert flows['AB'] == 50
+        assert sum(flows.values()) == 50
 
 
 class TestIncremental:
     """测试增量分配"""
     
-    @pytest.fixture
-    def test_network(self):
-        """加载测试网络"""
-        network = Network()
-        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
-        network.load_from_json(os.path.join(data_dir, 'network.json'))
-        return network
-    
-    @pytest.fixture
-    def test_demand(self):
-        """加载测试需求"""
-        demand = Demand()
-        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
-        demand.load_from_json(os.path.join(data_dir, 'demand.json'))
-        return demand
-    
     def test_incremental_basic(self, test_network, test_demand):
         """测试增量分配基本功能"""
         flows = incremental_assignment(test_network, test_demand, n_iterations=4)
@@ -156,22 +294,6 @@ class TestIncremental:
 class TestFrankWolfe:
     """测试Frank-Wolfe算法"""
     
-    @pytest.fixture
-    def test_network(self):
-        """加载测试网络"""
-        network = Network()
-        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
-        network.load_from_json(os.path.join(data_dir, 'network.json'))
-        return network
-    
-    @pytest.fixture
-    def test_demand(self):
-        """加载测试需求"""
-        demand = Demand()
-        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
-        demand.load_from_json(os.path.join(data_dir, 'demand.json'))
-        return demand
-    
     def test_frank_wolfe_basic(self, test_network, test_demand):
         """测试Frank-Wolfe基本功能"""
         flows, history = frank_wolfe_assignment(
@@ -206,4 +328,19 @@ class TestFrankWolfe:
             first_gap = history[0]['relative_gap']
             last_gap = history[-1]['relative_gap']
             assert last_gap <= first_gap
-
+    
+    def test_line_search_minimizes_objective(self, test_network, test_demand):
+        """测试线搜索步长不劣于网格采样"""
+        current = all_or_nothing_assignment(test_network, test_demand)
+        for link_id, flow in current.items():
+            test_network.links[link_id].update_flow(flow)
+        auxiliary = all_or_nothing_assignment(test_network, test_demand)
+        
+        alpha = line_search(test_network, current, auxiliary)
+        assert 0.0 <= alpha <= 1.0
+        
+        x = test_network.flows_to_array(current)
+        d = test_network.flows_to_array(auxiliary) - x
+        best = calculate_objective(test_network, x + alpha * d)
+        for i in range(101):
+            assert best <= calculate_objective(test_network, x + i / 100 * d) + 1e-6
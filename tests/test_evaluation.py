@@ -1,14 +1,14 @@
 """测试评估指标"""
 import pytest
-import os
-import sys
-
-# 添加src目录到路径
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from models.network import Network
 from models.link import Link
-from evaluation.metrics import calculate_total_travel_time, calculate_relative_gap
+from evaluation.metrics import (
+    calculate_total_travel_time,
+    calculate_relative_gap,
+    calculate_relative_gap_from_sptt,
+    calculate_link_performance
+)
 
 
 class TestMetrics:
@@ -55,4 +55,38 @@ class TestMetrics:
         
         # 相对间隙应该是非负数
         assert gap >= 0
+    
+    def test_calculate_relative_gap_equilibrium(self, simple_network):
+        """测试辅助流量与当前流量相同时间隙为0"""
+        simple_network.links['AB'].update_flow(1000)
+        
+        gap = calculate_relative_gap(simple_network, {'AB': 1000})
+        assert abs(gap) < 1e-12
+    
+    def test_calculate_relative_gap_from_sptt(self, simple_network):
+        """测试由SPTT计算的相对间隙与逐路段计算一致"""
+        simple_network.links['AB'].update_flow(1000)
+        
+        travel_time = simple_network.links['AB'].get_travel_time()
+        total_time = 1000 * travel_time
+        sptt = 800 * travel_time
+        
+        expected = calculate_relative_gap(simple_network, {'AB': 800})
+        assert abs(calculate_relative_gap_from_sptt(total_time, sptt) - expected) < 1e-12
+    
+    def test_calculate_link_performance(self, simple_network):
+        """测试路段性能指标按列返回"""
+        simple_network.set_flows({'AB': 900})
+        
+        performance = calculate_link_performance(simple_network)
+        assert list(performance['link_ids']) == ['AB']
+        assert performance['flow'][0] == 900
+        assert performance['capacity'][0] == 1800
+        assert performance['ratio'][0] == 0.5
+        assert performance['travel_time'][0] == simple_network.links['AB'].get_travel_time()
+        assert performance['free_flow_time'][0] == simple_network.links['AB'].get_free_flow_time()
+        
+        # 返回的数组是副本，修改不影响路网缓存的行程时间
+        performance['travel_time'][0] = 0.0
+        assert simple_network.current_times[0] == simple_network.links['AB'].get_travel_time()
 
@@ -1,12 +1,6 @@
 """集成测试"""
 import pytest
-import os
-import sys
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
-
-from models.network import Network
-from models.demand import Demand
 from algorithms.all_or_nothing import all_or_nothing_assignment
 from algorithms.incremental import incremental_assignment
 from algorithms.frank_wolfe import frank_wolfe_assignment
@@ -17,20 +11,14 @@ class TestIntegration:
     """端到端集成测试"""
     
     @pytest.fixture
-    def network(self):
-        """加载真实路网"""
-        network = Network()
-        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
-        network.load_from_json(os.path.join(data_dir, 'network.json'))
-        return network
+    def network(self, test_network):
+        """真实路网（会话内共享加载结果的副本）"""
+        return test_network
     
     @pytest.fixture
-    def demand(self):
-        """加载真实需求"""
-        demand = Demand()
-        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
-        demand.load_from_json(os.path.join(data_dir, 'demand.json'))
-        return demand
+    def demand(self, test_demand):
+        """真实需求（会话内共享加载结果的副本）"""
+        return test_demand
     
     def test_full_workflow(self, network, demand):
         """测试完整工作流程"""
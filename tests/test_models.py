@@ -2,10 +2,9 @@
 import pytest
 import json
 import os
-import sys
+import shutil
 
-# 添加src目录到路径
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import numpy as np
 
 from models.link import Link
 from models.network import Network
@@ -61,6 +60,24 @@ class TestLink:
         travel_time = link.get_travel_time(1800)
         assert abs(travel_time - 2.0) < 0.001
     
+    def test_get_travel_time_negative_flow(self):
+        """测试负流量按0处理，行程时间取自由流时间"""
+        link = Link('A', 'B', length=15.0, capacity=1800, speed_max=30, flow=0)
+        assert link.get_travel_time(-1e-9) == link.get_free_flow_time()
+        assert link.get_travel_time(-3600) == link.get_free_flow_time()
+    
+    def test_invalid_capacity(self):
+        """测试非正通行能力"""
+        with pytest.raises(ValueError):
+            Link('A', 'B', length=10.0, capacity=0, speed_max=30)
+    
+    def test_slots(self):
+        """测试路段使用__slots__，不创建实例字典"""
+        link = Link('A', 'B', length=15.0, capacity=1800, speed_max=30)
+        assert not hasattr(link, '__dict__')
+        with pytest.raises(AttributeError):
+            link.extra = 1
+    
     def test_update_flow(self):
         """测试更新流量"""
         link = Link('A', 'B', length=15.0, capacity=1800, speed_max=30, flow=0)
@@ -74,14 +91,15 @@ class TestLink:
         """测试获取链路ID"""
         link = Link('A', 'B', length=15.0, capacity=1800, speed_max=30, flow=0)
         assert link.get_id() == 'AB'
+        assert link.get_id() is link.get_id()
 
 
 class TestNetwork:
     """测试Network类"""
     
-    @pytest.fixture
-    def temp_network_json(self, tmp_path):
-        """创建临时的network.json文件"""
+    @pytest.fixture(scope="module")
+    def temp_network_json(self, tmp_path_factory):
+        """创建临时的network.json文件（模块内共享，测试不得修改）"""
         network_data = {
             "nodes": {
                 "name": ["A", "B", "C"],
@@ -94,11 +112,18 @@ class TestNetwork:
                 "speedmax": [30, 60]
             }
         }
-        json_file = tmp_path / "network.json"
+        json_file = tmp_path_factory.mktemp("network") / "network.json"
         with open(json_file, 'w') as f:
             json.dump(network_data, f)
         return json_file
     
+    @pytest.fixture(scope="module")
+    def network(self, temp_network_json):
+        """模块内只加载一次的路网，仅供不修改路网的测试使用"""
+        network = Network()
+        network.load_from_json(str(temp_network_json))
+        return network
+    
     def test_load_from_json(self, temp_network_json):
         """测试从JSON加载网络数据"""
         network = Network()
@@ -113,11 +138,137 @@ class TestNetwork:
         assert 'AB' in network.links
         assert 'BC' in network.links
     
-    def test_calculate_link_length(self, temp_network_json):
-        """测试路段长度计算"""
+    def test_load_from_json_append(self, temp_network_json, tmp_path):
+        """测试追加加载的路网文件可引用先前加载的节点"""
+        extra_data = {
+            "nodes": {"name": ["D"], "x": [20], "y": [10]},
+            "links": {"between": ["CD", "BD"], "capacity": [1800, 1800], "speedmax": [30, 30]}
+        }
+        extra_file = tmp_path / "extra.json"
+        with open(extra_file, 'w') as f:
+            json.dump(extra_data, f)
+        
+        network = Network()
+        network.load_from_json(str(temp_network_json))
+        network.load_from_json(str(extra_file))
+        
+        assert len(network.nodes) == 4
+        assert len(network.links) == 4
+        assert abs(network.get_link('C', 'D').length - 10.0) < 1e-9
+        assert abs(network.get_link('B', 'D').length - 200 ** 0.5) < 1e-9
+        assert abs(network.get_link('A', 'B').length - 10.0) < 1e-9
+    
+    def test_load_from_json_without_orjson(self, temp_network_json, monkeypatch):
+        """测试未安装orjson/pysimdjson时回退到标准库json"""
+        import models._json as json_module
+        monkeypatch.setattr(json_module, 'orjson', None)
+        monkeypatch.setattr(json_module, 'simdjson', None)
+        
         network = Network()
         network.load_from_json(str(temp_network_json))
+        assert len(network.nodes) == 3
+        assert len(network.links) == 2
+    
+    def test_load_from_json_simdjson_without_orjson(self, temp_network_json, monkeypatch):
+        """测试未安装orjson时使用pysimdjson按需解析"""
+        pytest.importorskip('simdjson')
+        import models._json as json_module
+        monkeypatch.setattr(json_module, 'orjson', None)
+        
+        network = Network()
+        network.load_from_json(str(temp_network_json))
+        assert len(network.nodes) == 3
+        assert abs(network.get_link('B', 'C').length - 10.0) < 1e-9
+    
+    def test_load_from_json_streaming(self, temp_network_json, tmp_path, monkeypatch):
+        """测试大文件经ijson流式解析，结果与完整解析一致（含列表形式的路段端点）"""
+        pytest.importorskip('ijson')
+        import models._json as json_module
+        list_form_file = tmp_path / "list_form.json"
+        with open(list_form_file, 'w') as f:
+            json.dump({
+                "nodes": {"name": ["AA", "B", "C"], "x": [0, 10, 20], "y": [0, 0, 0]},
+                "links": {"between": [["AA", "B"], ["B", "C"]], "capacity": [1800, 3600], "speedmax": [30, 60]}
+            }, f)
+        
+        for path in (str(temp_network_json), str(list_form_file)):
+            expected = Network()
+            expected.load_from_json(path)
+            
+            with monkeypatch.context() as m:
+                m.setattr(json_module, 'STREAM_MIN_BYTES', 0)
+                network = Network()
+                network.load_from_json(path)
+            
+            assert len(network.links) == 2
+            assert network.nodes == expected.nodes
+            assert sorted(network.links) == sorted(expected.links)
+            assert network.t0_arr.tolist() == expected.t0_arr.tolist()
+    
+    def test_load_from_json_sidecar_cache(self, temp_network_json, tmp_path, monkeypatch):
+        """测试pickle旁路缓存：首次加载写入，再次加载直接恢复，文件变化后失效"""
+        import models.network as network_module
+        path = shutil.copy(temp_network_json, tmp_path)
+        
+        network = Network()
+        network.load_from_json(path, use_cache=True)
+        assert os.path.exists(path + '.pkl')
+        
+        # 缓存命中时不应再解析JSON
+        def fail(*args, **kwargs):
+            raise AssertionError("JSON should not be parsed on a cache hit")
+        monkeypatch.setattr(network_module, 'load_json_fields', fail)
+        
+        cached = Network()
+        cached.load_from_json(path, use_cache=True)
+        assert sorted(cached.links) == sorted(network.links)
+        assert cached.nodes == network.nodes
+        assert cached.adjacency == network.adjacency
+        assert cached.t0_arr.tolist() == network.t0_arr.tolist()
+        assert cached.cap_arr.tolist() == network.cap_arr.tolist()
+        assert cached.indices.tolist() == network.indices.tolist()
+        assert cached.flow_arr is not network.flow_arr
+        
+        # 恢复的路段应绑定到新路网
+        cached.get_link('A', 'B').update_flow(100)
+        assert cached.flow_arr[cached.link_index['AB']] == 100
+        assert network.get_link('A', 'B').flow == 0
+        
+        # 数据文件变化后缓存失效，重新解析
+        monkeypatch.undo()
+        with open(path, 'a') as f:
+            f.write(' ')
+        reloaded = Network()
+        reloaded.load_from_json(path, use_cache=True)
+        assert len(reloaded.links) == 2
+    
+    def test_load_from_json_sidecar_version_mismatch(self, temp_network_json, tmp_path, monkeypatch):
+        """测试缓存格式版本号变化后旧缓存视为未命中"""
+        import models._sidecar as sidecar_module
+        path = shutil.copy(temp_network_json, tmp_path)
+        Network().load_from_json(path, use_cache=True)
+        assert sidecar_module.load_sidecar(path) is not None
+        
+        monkeypatch.setattr(sidecar_module, 'SIDECAR_VERSION', sidecar_module.SIDECAR_VERSION + 1)
+        assert sidecar_module.load_sidecar(path) is None
+        
+        network = Network()
+        network.load_from_json(path, use_cache=True)
+        assert len(network.links) == 2
+        assert sidecar_module.load_sidecar(path) is not None
+    
+    def test_save_sidecar_unpicklable(self, temp_network_json, tmp_path):
+        """测试对象无法序列化时静默跳过写入，且不残留临时文件"""
+        import threading
+        from models._sidecar import save_sidecar
+        path = shutil.copy(temp_network_json, tmp_path)
         
+        save_sidecar(path, {'lock': threading.Lock()})
+        
+        assert sorted(os.listdir(tmp_path)) == [os.path.basename(path)]
+    
+    def test_calculate_link_length(self, network):
+        """测试路段长度计算"""
         # A(0,0) -> B(10,0): 距离 = 10
         link_ab = network.get_link('A', 'B')
         assert abs(link_ab.length - 10.0) < 0.001
@@ -126,11 +277,8 @@ class TestNetwork:
         link_bc = network.get_link('A', 'B')
         assert abs(link_bc.length - 10.0) < 0.001
     
-    def test_get_link(self, temp_network_json):
+    def test_get_link(self, network):
         """测试获取指定路段"""
-        network = Network()
-        network.load_from_json(str(temp_network_json))
-        
         link = network.get_link('A', 'B')
         assert link is not None
         assert link.from_node == 'A'
@@ -140,11 +288,19 @@ class TestNetwork:
         non_link = network.get_link('A', 'C')
         assert non_link is None
     
-    def test_get_all_links(self, temp_network_json):
-        """测试获取所有路段"""
+    def test_get_link_multichar_nodes(self):
+        """测试多字符节点名不会因ID拼接产生歧义"""
         network = Network()
-        network.load_from_json(str(temp_network_json))
+        network.nodes = {'A': (0, 0), 'BC': (1, 0), 'AB': (0, 1), 'C': (1, 1)}
+        link = Link('AB', 'C', 1.0, 1800, 30, 0)
+        network.links = {'ABC': link}
+        network.adjacency = {'A': [], 'BC': [], 'AB': [('C', 'ABC')], 'C': []}
         
+        assert network.get_link('AB', 'C') is link
+        assert network.get_link('A', 'BC') is None
+    
+    def test_get_all_links(self, network):
+        """测试获取所有路段"""
         links = network.get_all_links()
         assert len(links) == 2
     
@@ -163,6 +319,21 @@ class TestNetwork:
         assert network.get_link('A', 'B').flow == 0
         assert network.get_link('B', 'C').flow == 0
     
+    def test_reset_flows_in_place(self, temp_network_json):
+        """测试重置流量原地清零数组并使缓存的行程时间失效"""
+        network = Network()
+        network.load_from_json(str(temp_network_json))
+        network.get_link('A', 'B').update_flow(1000)
+        busy_times = network.current_times
+        flow_arr = network.flow_arr
+        
+        network.reset_flows()
+        
+        assert network.flow_arr is flow_arr
+        assert not network.flow_arr.any()
+        assert network.current_times is not busy_times
+        assert network.current_times.tolist() == network.t0_arr.tolist()
+    
     def test_get_total_travel_time(self, temp_network_json):
         """测试计算总出行时间"""
         network = Network()
@@ -175,20 +346,172 @@ class TestNetwork:
         # 总出行时间 = 900 * 1.125 + 1800 * 2.0 = 1012.5 + 3600 = 4612.5
         total_time = network.get_total_travel_time()
         assert abs(total_time - 4612.5) < 1.0
+    
+    def test_get_total_travel_time_matches_links(self, temp_network_json):
+        """测试向量化总出行时间与逐路段累加一致"""
+        network = Network()
+        network.load_from_json(str(temp_network_json))
+        network.get_link('A', 'B').update_flow(900)
+        network.get_link('B', 'C').update_flow(1800)
+        
+        expected = sum(link.flow * link.get_travel_time() for link in network.get_all_links())
+        assert abs(network.get_total_travel_time() - expected) < 1e-9
+        network.current_times
+        assert abs(network.get_total_travel_time() - expected) < 1e-9
+        
+        network.reset_flows()
+        assert network.get_total_travel_time() == 0.0
+        assert network.flow_arr.sum() == 0.0
+    
+    def test_link_arrays(self, temp_network_json):
+        """测试路段属性数组与Link对象同步"""
+        network = Network()
+        network.load_from_json(str(temp_network_json))
+        
+        idx = network.link_index['BC']
+        assert network.cap_arr[idx] == 3600
+        assert abs(network.t0_arr[idx] - 10.0 / 60) < 1e-9
+        
+        # update_flow应同步写入flow_arr
+        network.get_link('B', 'C').update_flow(500)
+        assert network.flow_arr[idx] == 500
+        
+        network.reset_flows()
+        assert network.flow_arr.sum() == 0
+    
+    def test_set_flows(self, temp_network_json):
+        """测试批量设置路段流量"""
+        network = Network()
+        network.load_from_json(str(temp_network_json))
+        
+        network.set_flows({'AB': 900})
+        assert network.get_link('A', 'B').flow == 900
+        assert network.get_link('B', 'C').flow == 0
+        assert network.array_to_flows(network.flow_arr) == {'AB': 900, 'BC': 0}
+    
+    def test_get_total_travel_time_bpr_values(self):
+        """测试向量化总出行时间的BPR数值（t0=0.5）"""
+        network = Network()
+        network.nodes = {'A': (0, 0), 'B': (15, 0), 'C': (30, 0)}
+        network.links = {
+            'AB': Link('A', 'B', 15.0, 1800, 30, 0),
+            'BC': Link('B', 'C', 15.0, 1800, 30, 0)
+        }
+        network.adjacency = {'A': [('B', 'AB')], 'B': [('C', 'BC')], 'C': []}
+        
+        network.set_flows({'AB': 900, 'BC': 1800})
+        # 900 * 0.5 * 1.5^2 + 1800 * 0.5 * 2^2 = 1012.5 + 3600 = 4612.5
+        assert abs(network.get_total_travel_time() - 4612.5) < 1e-9
+    
+    def test_bpr_total_kernel(self, temp_network_json, monkeypatch):
+        """测试大规模路网使用的Numba总出行时间内核与NumPy结果一致"""
+        import models.network as network_module
+        
+        network = Network()
+        network.load_from_json(str(temp_network_json))
+        network.set_flows({'AB': 900, 'BC': 1800})
+        expected = network.get_total_travel_time()
+        
+        monkeypatch.setattr(network_module, 'BPR_KERNEL_MIN_LINKS', 0)
+        network.bump_weight_version()
+        assert abs(network.get_total_travel_time() - expected) < 1e-9
+    
+    def test_update_flows_and_total_time(self, temp_network_json):
+        """测试流量累加与总出行时间融合计算，与分步计算结果一致"""
+        network = Network()
+        network.load_from_json(str(temp_network_json))
+        network.set_flows({'AB': 400})
+        times = network.current_times
+        
+        total = network.update_flows_and_total_time({'AB': 500, 'BC': 1800})
+        
+        assert network.array_to_flows(network.flow_arr) == {'AB': 900, 'BC': 1800}
+        assert network.current_times is not times
+        assert abs(total - network.get_total_travel_time()) < 1e-9
+        
+        # 长度不符的增量数组应被拒绝，流量保持不变
+        with pytest.raises(ValueError):
+            network.update_flows_and_total_time(np.ones(1))
+        assert network.array_to_flows(network.flow_arr) == {'AB': 900, 'BC': 1800}
+    
+    def test_sorted_link_order(self, network):
+        """测试按路段ID排序的下标缓存"""
+        order = network.sorted_link_order
+        link_ids = list(network.link_index)
+        assert [link_ids[i] for i in order] == sorted(network.links)
+        assert network.sorted_link_order is order
+    
+    def test_link_flow_view(self, temp_network_json):
+        """测试路段流量为路网数组视图，路段被移除后保留流量"""
+        network = Network()
+        network.load_from_json(str(temp_network_json))
+        link = network.get_link('A', 'B')
+        
+        link.flow = 300
+        assert network.flow_arr[network.link_index['AB']] == 300
+        
+        network.links = {'BC': network.links['BC']}
+        network.ensure_arrays()
+        assert link.idx == -1
+        assert link.flow == 300
+        assert len(network.flow_arr) == 1
+    
+    def test_compute_bpr_times(self, temp_network_json):
+        """测试向量化BPR行程时间与Link一致"""
+        network = Network()
+        network.load_from_json(str(temp_network_json))
+        network.get_link('A', 'B').update_flow(900)
+        
+        times = network.compute_bpr_times()
+        for link_id, idx in network.link_index.items():
+            assert abs(times[idx] - network.links[link_id].get_travel_time()) < 1e-12
+        
+        network.get_link('B', 'C').update_flow(-10)
+        times = network.compute_bpr_times()
+        assert times[network.link_index['BC']] == network.t0_arr[network.link_index['BC']]
+    
+    def test_current_times_cached(self, temp_network_json):
+        """测试行程时间按权重版本缓存"""
+        network = Network()
+        network.load_from_json(str(temp_network_json))
+        
+        times = network.current_times
+        assert network.current_times is times
+        
+        network.get_link('A', 'B').update_flow(900)
+        assert network.current_times is not times
+        assert network.current_times[network.link_index['AB']] > times[network.link_index['AB']]
+    
+    def test_csr_adjacency(self, network):
+        """测试CSR邻接结构"""
+        b = network.node_index['B']
+        start, end = network.indptr[b], network.indptr[b + 1]
+        assert end - start == 1
+        assert network.node_names[network.indices[start]] == 'C'
+        assert network.link_idx[start] == network.link_index['BC']
+        
+        neighbors, links = network.neighbors_iloc(b)
+        assert [network.node_names[v] for v in neighbors] == ['C']
+        assert list(links) == [network.link_index['BC']]
+    
+    def test_heuristic_scale(self, network):
+        """测试A*启发函数系数取最快路段的 t0/直线距离"""
+        # BC: t0 = 10/60, 直线距离 = 10
+        assert abs(network.heuristic_scale - 1.0 / 60) < 1e-12
 
 
 class TestDemand:
     """测试Demand类"""
     
-    @pytest.fixture
-    def temp_demand_json(self, tmp_path):
-        """创建临时的demand.json文件"""
+    @pytest.fixture(scope="module")
+    def temp_demand_json(self, tmp_path_factory):
+        """创建临时的demand.json文件（模块内共享，测试不得修改）"""
         demand_data = {
             "from": ["A", "B"],
             "to": ["C", "A"],
             "amount": [1000, 500]
         }
-        json_file = tmp_path / "demand.json"
+        json_file = tmp_path_factory.mktemp("demand") / "demand.json"
         with open(json_file, 'w') as f:
             json.dump(demand_data, f)
         return json_file
@@ -203,6 +526,20 @@ class TestDemand:
         assert od_pairs[0] == ('A', 'C', 1000)
         assert od_pairs[1] == ('B', 'A', 500)
     
+    def test_load_from_json_sidecar_cache(self, temp_demand_json, tmp_path, monkeypatch):
+        """测试需求数据的pickle旁路缓存"""
+        import models.demand as demand_module
+        path = shutil.copy(temp_demand_json, tmp_path)
+        Demand().load_from_json(path, use_cache=True)
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("JSON should not be parsed on a cache hit")
+        monkeypatch.setattr(demand_module, 'load_json', fail)
+        
+        demand = Demand()
+        demand.load_from_json(path, use_cache=True)
+        assert demand.get_od_pairs() == [('A', 'C', 1000), ('B', 'A', 500)]
+    
     def test_get_od_pairs(self, temp_demand_json):
         """测试获取OD对列表"""
         demand = Demand()
@@ -211,4 +548,25 @@ class TestDemand:
         od_pairs = demand.get_od_pairs()
         assert isinstance(od_pairs, list)
         assert len(od_pairs) == 2
+    
+    def test_get_od_arrays(self, temp_demand_json):
+        """测试OD并行数组与od_pairs对齐，od_pairs被替换后重建"""
+        demand = Demand()
+        demand.load_from_json(str(temp_demand_json))
+        
+        origins, destinations, amounts = demand.get_od_arrays()
+        assert origins == ['A', 'B']
+        assert destinations == ['C', 'A']
+        assert amounts.tolist() == [1000.0, 500.0]
+        assert demand.get_od_arrays()[2] is amounts
+        assert demand.get_total_demand() == 1500
+        
+        demand.od_pairs = [('A', 'B', 50)]
+        assert demand.get_od_arrays()[0] == ['A']
+        assert demand.get_total_demand() == 50
+        
+        # 长度不变的整体替换同样触发重建
+        demand.od_pairs = [('B', 'C', 70)]
+        assert demand.get_od_arrays()[0] == ['B']
+        assert demand.get_total_demand() == 70
 